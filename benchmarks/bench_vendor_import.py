@@ -0,0 +1,60 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from vendor_data import import_vendor_dump, load_panel
+
+# -----------------------
+# CONFIG
+# -----------------------
+N_TICKERS = 5000
+YEARS = 30
+GZIP_SHARE = 0.2   # fraction of files written as .csv.gz
+N_JOBS = None      # all cores
+SEED = 7
+
+def main():
+    rng = np.random.default_rng(SEED)
+    calendar = pd.bdate_range("1995-01-02", periods=252 * YEARS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out = Path(tmp) / "dump", Path(tmp) / "panel"
+        src.mkdir()
+
+        # -----------------------
+        # Synthetic vendor dump: late listings, occasional splits and quarterly dividends
+        # -----------------------
+        t0 = time.perf_counter()
+        date_str = calendar.strftime("%Y-%m-%d").to_numpy()
+        for i in range(N_TICKERS):
+            start = int(rng.integers(0, len(calendar) // 2)) if rng.random() < 0.3 else 0
+            n = len(calendar) - start
+            close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+            split = np.zeros(n)
+            split[rng.integers(0, n, size=rng.integers(0, 3))] = 2.0
+            dividend = np.zeros(n)
+            dividend[::63] = 0.004 * close[::63]
+            name = f"T{i:05d}.csv.gz" if rng.random() < GZIP_SHARE else f"T{i:05d}.csv"
+            pd.DataFrame({
+                "date": date_str[start:], "close": close.round(4), "split": split, "dividend": dividend.round(4),
+            }).to_csv(src / name, index=False)
+        print(f"wrote {N_TICKERS} files in {time.perf_counter() - t0:.1f}s")
+
+        report = import_vendor_dump(src, out, n_jobs=N_JOBS)
+
+        t0 = time.perf_counter()
+        panel = load_panel(out, tickers=[f"T{i:05d}" for i in range(0, N_TICKERS, 10)], start="2015-01-01")
+        t_load = time.perf_counter() - t0
+
+    print(f"\n=== VENDOR IMPORT, {N_TICKERS} tickers x {YEARS} years ===")
+    for k, v in report.items():
+        print(f"{k:14s}: {v:,.2f}" if isinstance(v, float) else f"{k:14s}: {v:,}")
+    print(f"load slice     : {panel.shape} in {t_load:.3f}s")
+
+if __name__ == "__main__":
+    main()
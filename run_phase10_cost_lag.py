@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from data import fetch_prices
+from strategy import moving_average_crossover_signals
+from cross_sectional_mom import build_cs_mom_weights
+from sensitivity import cost_lag_surface
+
+# -----------------------
+# CONFIG
+# -----------------------
+TICKERS = ["SPY", "AAPL", "MSFT", "NVDA"]
+CS_TICKERS = [
+    "SPY","QQQ","IWM","DIA",
+    "XLK","XLF","XLE","XLY","XLP","XLV","XLI","XLU","XLB","XLRE",
+    "TLT","IEF","SHY",
+    "GLD","SLV",
+    "USO","UNG",
+    "VNQ",
+    "EEM","EFA",
+    "ARKK"
+]
+START = "2018-01-01"
+
+SHORT_GRID = [10, 15, 20, 30, 40, 50]
+LONG_GRID  = [60, 80, 100, 120, 150, 200]
+
+COSTS = [0.0002, 0.0005, 0.001, 0.002]   # 2 / 5 / 10 / 20 bps
+LAGS = [0, 1, 2, 3]                      # extra days of fill delay
+
+# -----------------------
+# MA crossover grid (equal-weight legs, cost per trade)
+# -----------------------
+prices = fetch_prices(TICKERS, start=START)
+ma_signals = {
+    f"MA_{s}_{l}": moving_average_crossover_signals(prices, short_window=s, long_window=l)
+    for s in SHORT_GRID for l in LONG_GRID if s < l
+}
+ma_cube = cost_lag_surface(ma_signals, prices, costs=COSTS, lags=LAGS)
+
+# -----------------------
+# CS momentum (weights already lagged one day, cost per 1x turnover)
+# -----------------------
+cs_prices = fetch_prices(CS_TICKERS, start=START)
+cs_weights = {"CS_126_21_5": build_cs_mom_weights(cs_prices, 126, 21, 5, 5)}
+cs_cube = cost_lag_surface(cs_weights, cs_prices, costs=COSTS, lags=LAGS, base_lag=0, aggregate="sum")
+
+cube = pd.concat([ma_cube, cs_cube])
+
+print("\n=== SHARPE BY COST (rows) AND EXTRA LAG (columns), MA_20_100 ===")
+print(cube.loc["MA_20_100", "sharpe_rf0"].unstack("lag"))
+print("\n=== SHARPE BY COST (rows) AND EXTRA LAG (columns), CS momentum ===")
+print(cube.loc["CS_126_21_5", "sharpe_rf0"].unstack("lag"))
+
+cube.to_csv("phase10_cost_lag_surface.csv")
+print("\nSaved: phase10_cost_lag_surface.csv")
@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from data import fetch_prices
+from strategy import (
+    moving_average_crossover_signals,
+    positions_from_signals,
+    backtest_long_only,
+    apply_transaction_costs,
+)
+from multi_strategy import combine_strategies
+from robustness import (
+    name_dependence,
+    subset_robustness,
+    leave_k_out_membership,
+    group_dropout_membership,
+    random_subset_membership,
+    random_subset_summary,
+)
+
+# -----------------------
+# CONFIG
+# -----------------------
+MA_TICKERS = ["SPY", "AAPL", "MSFT", "NVDA"]
+TICKERS = [
+    "SPY","QQQ","IWM","DIA",
+    "XLK","XLF","XLE","XLY","XLP","XLV","XLI","XLU","XLB","XLRE",
+    "TLT","IEF","SHY",
+    "GLD","SLV",
+    "USO","UNG",
+    "VNQ",
+    "EEM","EFA",
+    "ARKK"
+]
+GROUPS = {
+    "SPY": "us_equity", "QQQ": "us_equity", "IWM": "us_equity", "DIA": "us_equity", "ARKK": "us_equity",
+    "XLK": "sector", "XLF": "sector", "XLE": "sector", "XLY": "sector", "XLP": "sector",
+    "XLV": "sector", "XLI": "sector", "XLU": "sector", "XLB": "sector", "XLRE": "sector",
+    "TLT": "rates", "IEF": "rates", "SHY": "rates",
+    "GLD": "metals", "SLV": "metals",
+    "USO": "energy", "UNG": "energy",
+    "VNQ": "real_estate",
+    "EEM": "intl_equity", "EFA": "intl_equity",
+}
+N_RANDOM = 2000
+
+# -----------------------
+# MA crossover (4 names): how much rides on NVDA?
+# -----------------------
+prices = fetch_prices(MA_TICKERS, start="2018-01-01")
+signal = moving_average_crossover_signals(prices, short_window=20, long_window=100)
+positions = positions_from_signals(signal)
+ma_legs = apply_transaction_costs(backtest_long_only(prices, positions), positions, cost_per_trade=0.0005)
+
+print("\n=== MA CROSSOVER: LEAVE-ONE-OUT ===")
+print(name_dependence(ma_legs))
+
+# -----------------------
+# Multi-strategy on the 25-ETF universe
+# -----------------------
+prices = fetch_prices(TICKERS, start="2018-01-01")
+legs = combine_strategies(
+    prices, trend_params=(20, 100), mr_params=(20, 1.0), w_trend=0.7, w_mr=0.3,
+    cost_per_trade=0.0005, target_ann_vol=0.14, return_legs=True,
+)
+
+loo = name_dependence(legs)
+l2o = subset_robustness(legs, leave_k_out_membership(legs.columns, 2))
+groups = subset_robustness(legs, group_dropout_membership(GROUPS, legs.columns))
+rand = subset_robustness(legs, random_subset_membership(legs.columns, N_RANDOM, frac=0.5))
+
+print("\n=== MULTI-STRATEGY: LEAVE-ONE-OUT (most important first) ===")
+print(loo.head(10))
+print("\n=== MULTI-STRATEGY: WORST LEAVE-TWO-OUT ===")
+print(l2o.sort_values("delta_sharpe").head(5))
+print("\n=== MULTI-STRATEGY: GROUP DROPOUT ===")
+print(groups)
+print(f"\n=== MULTI-STRATEGY: {N_RANDOM} RANDOM HALF-UNIVERSES ===")
+print(random_subset_summary(rand))
+
+pd.concat({"loo": loo, "l2o": l2o, "group": groups, "random": rand}).to_csv("phase11_subset_robustness.csv")
+print("\nSaved: phase11_subset_robustness.csv")
@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from data import fetch_prices
+from strategy import (
+    moving_average_crossover_signals,
+    positions_from_signals,
+    backtest_long_only,
+    apply_transaction_costs,
+)
+from cross_sectional_mom import momentum_surface
+from reality_check import reality_check
+
+# -----------------------
+# CONFIG
+# -----------------------
+MA_TICKERS = ["SPY", "AAPL", "MSFT", "NVDA"]
+CS_TICKERS = [
+    "SPY","QQQ","IWM","DIA",
+    "XLK","XLF","XLE","XLY","XLP","XLV","XLI","XLU","XLB","XLRE",
+    "TLT","IEF","SHY",
+    "GLD","SLV",
+    "USO","UNG",
+    "VNQ",
+    "EEM","EFA",
+    "ARKK"
+]
+START = "2018-01-01"
+SHORT_GRID = [10, 15, 20, 30, 40, 50]
+LONG_GRID  = [60, 80, 100, 120, 150, 200]
+COST_PER_TRADE = 0.0005
+
+N_BOOT = 10000
+MEAN_BLOCK = 10
+SEED = 7
+
+if __name__ == "__main__":
+    # -----------------------
+    # Every MA config we searched over
+    # -----------------------
+    prices = fetch_prices(MA_TICKERS, start=START)
+    ma = {}
+    for s in SHORT_GRID:
+        for l in LONG_GRID:
+            if s >= l:
+                continue
+            positions = positions_from_signals(moving_average_crossover_signals(prices, s, l))
+            strat_ret = apply_transaction_costs(backtest_long_only(prices, positions), positions, COST_PER_TRADE)
+            ma[f"MA_{s}_{l}"] = strat_ret.mean(axis=1)
+    ma = pd.DataFrame(ma)
+
+    # -----------------------
+    # Every CS momentum config from the parameter surface
+    # -----------------------
+    cs_prices = fetch_prices(CS_TICKERS, start=START)
+    _, cs = momentum_surface(
+        cs_prices,
+        lookbacks=[63, 126, 189, 252],
+        skips=[0, 5, 21],
+        top_ns=[2, 3, 5, 7],
+        return_series=True,
+    )
+    cs.columns = [f"CS_{lb}_{sk}_{t}_{b}" for lb, sk, t, b in cs.columns]
+
+    for name, rets in [("MA crossover grid", ma), ("CS momentum surface", cs)]:
+        res = reality_check(rets, n_boot=N_BOOT, mean_block=MEAN_BLOCK, seed=SEED)
+        print(f"\n=== REALITY CHECK / SPA: {name} ({rets.shape[1]} configs, {N_BOOT} bootstraps) ===")
+        print(res)
+
+    # Against buy & hold SPY instead of zero
+    spy = prices["SPY"].pct_change().fillna(0.0)
+    res = reality_check(ma, benchmark=spy, n_boot=N_BOOT, mean_block=MEAN_BLOCK, seed=SEED)
+    print("\n=== REALITY CHECK / SPA: MA crossover grid vs buy & hold SPY ===")
+    print(res)
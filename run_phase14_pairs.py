@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from data import fetch_prices
+from strategy import performance_metrics
+from pairs import screen_pairs, run_pairs
+
+# -----------------------
+# CONFIG
+# -----------------------
+TICKERS = [
+    "SPY","QQQ","IWM","DIA",
+    "XLK","XLF","XLE","XLY","XLP","XLV","XLI","XLU","XLB","XLRE",
+    "TLT","IEF","SHY",
+    "GLD","SLV",
+    "USO","UNG",
+    "VNQ",
+    "EEM","EFA",
+    "ARKK"
+]
+START = "2018-01-01"
+TRAIN_END = "2022-12-31"   # screen on train, trade on test (2023-present)
+SCREEN_WINDOW = 504        # two years of formation data
+MIN_CORR = 0.6
+N_PAIRS = 5
+
+HEDGE_WINDOW = 60
+Z_WINDOW = 20
+ENTRY_Z = 2.0
+EXIT_Z = 0.5
+COST = 0.0005
+
+if __name__ == "__main__":
+    prices = fetch_prices(TICKERS, start=START)
+
+    # -----------------------
+    # Screen every pair on the training window
+    # -----------------------
+    screen = screen_pairs(prices, window=SCREEN_WINDOW, as_of=TRAIN_END, min_corr=MIN_CORR, adf_lags=1, top=None)
+    print(f"\n=== PAIR SCREEN ({len(screen)} pairs with corr >= {MIN_CORR}, window ending {TRAIN_END}) ===")
+    print(screen.head(15).to_string(index=False))
+    screen.to_csv("phase14_pair_screen.csv", index=False)
+
+    # -----------------------
+    # Trade the top pairs out of sample
+    # -----------------------
+    chosen = screen[screen["coint_5pct"]].head(N_PAIRS)
+    if chosen.empty:
+        chosen = screen.head(N_PAIRS)
+    print("\nTraded pairs:", ", ".join(f"{y}/{x}" for y, x in zip(chosen["y"], chosen["x"])))
+
+    port = run_pairs(
+        prices, chosen, hedge_window=HEDGE_WINDOW, z_window=Z_WINDOW,
+        entry_z=ENTRY_Z, exit_z=EXIT_Z, cost_per_1x_turnover=COST,
+    )
+    test = port.loc[TRAIN_END:].iloc[1:]
+    print("\n=== PAIRS SPREAD Z-SCORE STRATEGY (test period) ===")
+    print(performance_metrics(test))
+
+    test.to_csv("phase14_pairs_returns.csv")
+    print("\nSaved: phase14_pair_screen.csv, phase14_pairs_returns.csv")
@@ -14,6 +14,7 @@ from strategy import (
     performance_metrics,
     apply_transaction_costs,
 )
+from ewma import ewma_crossover_signals, ewma_crossover_surface
 
 # -----------------------
 # CONFIG
@@ -33,11 +34,19 @@ LAST_TRADE_YEAR = 2025
 
 MIN_TRADES_OK = 3
 
+# EWMA crossover half-life grid (same role as SHORT_GRID / LONG_GRID)
+FAST_HL_GRID = [2, 5, 10, 15, 20, 30]
+SLOW_HL_GRID = [40, 60, 80, 100, 150, 200]
+
 # -----------------------
 # Helpers
 # -----------------------
-def port_returns_with_costs(prices: pd.DataFrame, short_w: int, long_w: int):
-    signal = moving_average_crossover_signals(prices, short_window=short_w, long_window=long_w)
+def port_returns_with_costs(prices: pd.DataFrame, short_w, long_w, family: str = "sma"):
+    # family "ewma": short_w / long_w are the fast / slow half-lives
+    if family == "ewma":
+        signal = ewma_crossover_signals(prices, fast_halflife=short_w, slow_halflife=long_w)
+    else:
+        signal = moving_average_crossover_signals(prices, short_window=short_w, long_window=long_w)
     positions = positions_from_signals(signal)
 
     trades = positions.diff().abs().sum().sum()
@@ -48,7 +57,25 @@ def port_returns_with_costs(prices: pd.DataFrame, short_w: int, long_w: int):
     port_ret = strat_ret_cost.mean(axis=1)  # equal-weight portfolio
     return port_ret, trades
 
-def best_params_on_train(train_prices: pd.DataFrame):
+def best_params_on_train(train_prices: pd.DataFrame, family: str = "sma"):
+    if family == "ewma":
+        # whole half-life grid in one pass; same trades filter and Sharpe pick as below
+        grid = ewma_crossover_surface(train_prices, FAST_HL_GRID, SLOW_HL_GRID, cost_per_trade=COST_PER_TRADE)
+        grid = grid[grid["trades"] >= MIN_TRADES_OK]
+        if grid["sharpe_rf0"].notna().sum() == 0:
+            return None
+        f, sl = grid["sharpe_rf0"].idxmax()
+        m = grid.loc[(f, sl)]
+        return {
+            "short_window": f,
+            "long_window": sl,
+            "sharpe": float(m["sharpe_rf0"]),
+            "mean_ann": float(m["mean_ann"]),
+            "vol_ann": float(m["vol_ann"]),
+            "max_drawdown": float(m["max_drawdown"]),
+            "trades": float(m["trades"]),
+        }
+
     best = None
     best_row = None
 
@@ -92,42 +119,47 @@ spy_eq_full = equity_curve(spy_ret_full).rename(columns={"SPY": "BuyHold_SPY"})
 # -----------------------
 # Walk-forward loop
 # -----------------------
-all_wfo_returns = []
-chosen_params = []
+def walk_forward(family: str = "sma"):
+    """Pick the best train-window params each year, then trade that year from a cold start."""
+    all_wfo_returns = []
+    chosen_params = []
+
+    for year in range(FIRST_TRADE_YEAR, LAST_TRADE_YEAR + 1):
+        train_end = str(year - 1)
+        test_year = str(year)
+
+        train = prices.loc[:train_end]
+        test = prices.loc[test_year:test_year]
 
-for year in range(FIRST_TRADE_YEAR, LAST_TRADE_YEAR + 1):
-    train_end = str(year - 1)
-    test_year = str(year)
+        if len(test) < 50:
+            continue  # not enough data
 
-    train = prices.loc[:train_end]
-    test = prices.loc[test_year:test_year]
+        best = best_params_on_train(train, family)
+        if best is None:
+            continue
 
-    if len(test) < 50:
-        continue  # not enough data
+        s = best["short_window"]
+        l = best["long_window"]
 
-    best = best_params_on_train(train)
-    if best is None:
-        continue
+        test_ret, test_trades = port_returns_with_costs(test, s, l, family)
 
-    s = int(best["short_window"])
-    l = int(best["long_window"])
+        chosen_params.append({
+            "trade_year": year,
+            "train_end_year": year - 1,
+            "short_window": s,
+            "long_window": l,
+            "train_best_sharpe": best["sharpe"],
+            "test_trades": float(test_trades),
+        })
 
-    test_ret, test_trades = port_returns_with_costs(test, s, l)
+        all_wfo_returns.append(test_ret.rename(f"WFO_{year}"))
 
-    chosen_params.append({
-        "trade_year": year,
-        "train_end_year": year - 1,
-        "short_window": s,
-        "long_window": l,
-        "train_best_sharpe": best["sharpe"],
-        "test_trades": float(test_trades),
-    })
+    wfo_ret = pd.concat(all_wfo_returns).sort_index()
+    wfo_ret = wfo_ret[~wfo_ret.index.duplicated(keep="first")]
+    return wfo_ret, pd.DataFrame(chosen_params)
 
-    all_wfo_returns.append(test_ret.rename(f"WFO_{year}"))
+wfo_ret, params_df = walk_forward("sma")
 
-# Combine yearly return segments into one continuous series
-wfo_ret = pd.concat(all_wfo_returns).sort_index()
-wfo_ret = wfo_ret[~wfo_ret.index.duplicated(keep="first")]
 wfo_eq = equity_curve(wfo_ret.to_frame("WFO_Strategy"))
 
 # Align benchmark to WFO timeline for fair comparison
@@ -141,10 +173,25 @@ print(performance_metrics(wfo_ret.to_frame("Portfolio")).rename(index={"Portfoli
 print("\nFinal Equity (WFO vs SPY) on WFO timeline:")
 print(comparison.tail(1))
 
-params_df = pd.DataFrame(chosen_params)
 params_df.to_csv("phase4_wfo_chosen_params.csv", index=False)
 wfo_ret.to_frame("WFO_Return").to_csv("phase4_wfo_returns.csv")
 
 print("\nSaved:")
 print("- phase4_wfo_chosen_params.csv")
 print("- phase4_wfo_returns.csv")
+
+# -----------------------
+# Walk-forward over the EWMA crossover grid
+# -----------------------
+# Same tooling and rules as the MA grid (MIN_TRADES_OK filter, cold-started
+# test years); only the signal family changes.
+ewma_wfo, ewma_params = walk_forward("ewma")
+ewma_params = ewma_params.rename(columns={"short_window": "fast_halflife", "long_window": "slow_halflife"})
+print("\n=== WALK-FORWARD PERFORMANCE (EWMA crossover grid) ===")
+print(performance_metrics(ewma_wfo.to_frame("Portfolio")).rename(index={"Portfolio": "WFO_EWMA"}))
+
+ewma_params.to_csv("phase4_wfo_ewma_chosen_params.csv", index=False)
+ewma_wfo.to_frame("WFO_EWMA_Return").to_csv("phase4_wfo_ewma_returns.csv")
+print("\nSaved:")
+print("- phase4_wfo_ewma_chosen_params.csv")
+print("- phase4_wfo_ewma_returns.csv")
@@ -6,7 +6,9 @@ sys.path.append(str(Path(__file__).parent / "src"))
 
 from data import fetch_prices
 from strategy import equity_curve, performance_metrics
-from cross_sectional_mom import run_cs_momentum
+from cross_sectional_mom import run_cs_momentum, momentum_surface, build_cs_mom_weights, compute_momentum_scores
+from trades import trade_ledger, trade_stats
+from quantile_sorts import quantile_portfolios, quantile_summary
 
 TICKERS = [
     "SPY","QQQ","IWM","DIA",
@@ -56,3 +58,44 @@ save_equity_png(
     "charts/equity_cs_momentum_vs_spy.png"
 )
 print("Saved chart: charts/equity_cs_momentum_vs_spy.png")
+
+# -----------------------
+# Parameter surface (all lookback x skip x top/bottom combos in one pass)
+# -----------------------
+surface = momentum_surface(
+    prices,
+    lookbacks=[63, 126, 189, 252],
+    skips=[0, 5, 21],
+    top_ns=[2, 3, 5, 7],
+    cost_per_1x_turnover=0.0005,
+)
+print("\n=== CS MOMENTUM PARAMETER SURFACE (top 10 by Sharpe) ===")
+print(surface.sort_values("sharpe_rf0", ascending=False).head(10))
+
+surface.to_csv("phase5_cs_momentum_surface.csv")
+print("\nSaved: phase5_cs_momentum_surface.csv")
+
+# -----------------------
+# Trade ledger for the headline config
+# -----------------------
+weights = build_cs_mom_weights(prices, lookback_days=126, skip_days=21, top_n=5, bottom_n=5)
+ledger = trade_ledger(weights, prices, cost_per_trade=0.0005)
+print("\n=== CS MOMENTUM TRADE STATS (by side) ===")
+print(trade_stats(ledger, by="side"))
+
+ledger.to_csv("phase5_cs_momentum_trades.csv", index=False)
+print("\nSaved: phase5_cs_momentum_trades.csv")
+
+# -----------------------
+# Quantile sorts: is momentum monotonic across the whole cross-section?
+# -----------------------
+scores = compute_momentum_scores(prices, lookback_days=126, skip_days=21)
+sorts = quantile_portfolios(scores, prices, n_quantiles=5, rebalance="M", cost_per_1x_turnover=0.0005)
+summary = quantile_summary(sorts)
+print("\n=== CS MOMENTUM QUINTILE PORTFOLIOS ===")
+print(summary)
+print(f"mean rank IC: {summary.attrs['mean_ic']:.3f}  (t = {summary.attrs['ic_tstat']:.2f})")
+print(f"monotonicity: {summary.attrs['monotonicity']:.2f}")
+
+summary.to_csv("phase5_cs_momentum_quintiles.csv")
+print("\nSaved: phase5_cs_momentum_quintiles.csv")
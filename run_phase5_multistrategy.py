@@ -26,6 +26,51 @@ metrics = performance_metrics(port_ret)
 print("\n=== MULTI-STRATEGY METRICS ===")
 print(metrics)
 
+# Same book, scaled at portfolio level with a shrunk EWMA covariance
+port_ret_cov = combine_strategies(
+    prices,
+    trend_params=(20, 100),
+    mr_params=(20, 1.0),
+    w_trend=0.75,
+    w_mr=0.25,
+    cost_per_trade=0.0005,
+    target_ann_vol=0.14,
+    vol_mode="portfolio",
+)
+print("\n=== MULTI-STRATEGY METRICS (portfolio-level vol target, 14% target) ===")
+print(performance_metrics(port_ret_cov))
+
+# Same book with the robust (rolling median / MAD) mean-reversion leg
+port_ret_robust = combine_strategies(
+    prices,
+    trend_params=(20, 100),
+    mr_params=(20, 1.0),
+    w_trend=0.75,
+    w_mr=0.25,
+    cost_per_trade=0.0005,
+    target_ann_vol=0.14,
+    mr_method="robust",
+)
+print("\n=== MULTI-STRATEGY METRICS (robust median/MAD mean reversion) ===")
+print(performance_metrics(port_ret_robust))
+
+# Same book sized off forecast vol instead of the trailing 20-day std
+# (GARCH / HAR fall back to the rolling std until their first fit, so all four start on the same bar)
+vol_runs = {"rolling": port_ret["Portfolio"]}
+for est in ["ewma", "har", "garch"]:
+    vol_runs[est] = combine_strategies(
+        prices,
+        trend_params=(20, 100),
+        mr_params=(20, 1.0),
+        w_trend=0.75,
+        w_mr=0.25,
+        cost_per_trade=0.0005,
+        target_ann_vol=0.14,
+        vol_estimator=est,
+    )["Portfolio"]
+print("\n=== MULTI-STRATEGY METRICS BY VOL ESTIMATOR ===")
+print(performance_metrics(pd.DataFrame(vol_runs)))
+
 eq = equity_curve(port_ret).rename(columns={"Portfolio": "MultiStrategy"})
 
 # Benchmark SPY
@@ -8,6 +8,8 @@ from data import fetch_prices
 from strategy import equity_curve, performance_metrics
 from multi_strategy import combine_strategies
 from cross_sectional_mom import run_cs_momentum
+from hrp import run_hrp
+from regimes import build_regime_labels, regime_metrics, regime_transitions
 
 # -----------------------
 # Universe (expanded)
@@ -60,6 +62,48 @@ metrics = performance_metrics(combo_ret)
 print("\n=== FINAL MULTI-STRATEGY PORTFOLIO ===")
 print(metrics)
 
+# -----------------------
+# Long-only allocation of the universe: HRP vs equal weight
+# -----------------------
+hrp_ret = run_hrp(prices, lookback=252, rebalance="M", reuse_tol=0.05, cost_per_1x_turnover=0.0005)
+ew_ret = prices.pct_change().mean(axis=1).fillna(0.0).loc[hrp_ret.index]
+alloc = pd.concat([hrp_ret["Portfolio"].rename("HRP"), ew_ret.rename("EqualWeight")], axis=1)
+alloc = alloc.loc[hrp_ret["Portfolio"].ne(0).idxmax():]  # from the first HRP rebalance
+
+print("\n=== UNIVERSE ALLOCATION: HRP vs EQUAL WEIGHT ===")
+print(performance_metrics(alloc))
+print(f"HRP rebalances: {hrp_ret.attrs['n_rebalances']}, cluster trees rebuilt: {hrp_ret.attrs['n_rebuilds']}")
+
+alloc.to_csv("phase6_hrp_vs_equal_weight.csv")
+print("Saved: phase6_hrp_vs_equal_weight.csv")
+
+# -----------------------
+# Regime breakdown (SPY vs 200d MA, SPY vol terciles, rates up/down)
+# -----------------------
+labels = build_regime_labels(prices, market="SPY", rates="TLT")
+books = pd.DataFrame({
+    "TrendMR": ts_ret,
+    "CS_Momentum": cs_ret,
+    "FullPortfolio": combo_ret["Portfolio"],
+    "SPY": prices["SPY"].pct_change().fillna(0),
+})
+by_regime = regime_metrics(books, labels)
+
+print("\n=== SHARPE BY REGIME ===")
+print(by_regime["sharpe_rf0"].unstack("strategy").round(2))
+print("\n=== MAX DRAWDOWN BY REGIME ===")
+print(by_regime["max_drawdown"].unstack("strategy").round(3))
+
+trend_switches = regime_transitions(labels["trend"], books, horizon=20)
+print("\n=== SPY 200D MA REGIME: TRANSITIONS ===")
+print(trend_switches["matrix"].round(3))
+print(trend_switches["spells"])
+print("\nFirst 20 days after a switch:")
+print(trend_switches["after_switch"].round(4))
+
+by_regime.to_csv("phase6_regime_metrics.csv")
+print("Saved: phase6_regime_metrics.csv")
+
 eq = equity_curve(combo_ret).rename(columns={"Portfolio": "FullPortfolio"})
 
 # Benchmark SPY
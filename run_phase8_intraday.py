@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from bars import read_bar_chunks, resample_bars, run_chunked, days_to_bars, periods_per_year
+from strategy import performance_metrics
+from multi_strategy import combine_strategies
+
+# -----------------------
+# CONFIG
+# -----------------------
+MINUTE_FILE = "data/minute_bars.csv"  # wide file: timestamp, one close column per ticker
+BAR_FREQ = "5min"
+CHUNK_ROWS = 500_000
+
+TREND_PARAMS = (20, 100)   # trading days
+MR_PARAMS = (20, 1.0)      # (trading days, entry z)
+VOL_WINDOW = 20            # trading days
+
+def strategy_fn(bars: pd.DataFrame) -> pd.DataFrame:
+    return combine_strategies(
+        bars,
+        trend_params=TREND_PARAMS,
+        mr_params=MR_PARAMS,
+        w_trend=0.7,
+        w_mr=0.3,
+        cost_per_trade=0.0005,
+        target_ann_vol=0.14,
+        vol_window=VOL_WINDOW,
+        bar_freq=BAR_FREQ,
+    )
+
+# History each chunk needs: slowest rolling window + vol window on the legs + shift/diff
+WARMUP = days_to_bars(max(TREND_PARAMS[1], MR_PARAMS[0]), BAR_FREQ) + days_to_bars(VOL_WINDOW, BAR_FREQ) + 2
+
+# -----------------------
+# Stream: minute file -> N-minute bars -> strategy returns
+# -----------------------
+bars = resample_bars(read_bar_chunks(MINUTE_FILE, chunksize=CHUNK_ROWS), BAR_FREQ)
+port_ret = pd.concat(run_chunked(bars, strategy_fn, warmup=WARMUP))
+
+metrics = performance_metrics(port_ret, periods_per_year=periods_per_year(BAR_FREQ))
+print(f"\n=== MULTI-STRATEGY ON {BAR_FREQ} BARS ===")
+print(metrics)
+
+port_ret.to_csv(f"phase8_intraday_{BAR_FREQ}_returns.csv")
+print(f"\nSaved: phase8_intraday_{BAR_FREQ}_returns.csv")
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from data import fetch_prices
+from multi_strategy import combine_strategies
+from cross_sectional_mom import run_cs_momentum
+from attribution import build_factor_returns, rolling_factor_attribution, attribution_summary
+
+# -----------------------
+# Universe + factor set
+# -----------------------
+TICKERS = [
+    "SPY","QQQ","IWM","DIA",
+    "XLK","XLF","XLE","XLY","XLP","XLV","XLI","XLU","XLB","XLRE",
+    "TLT","IEF","SHY",
+    "GLD","SLV",
+    "USO","UNG",
+    "VNQ",
+    "EEM","EFA",
+    "ARKK"
+]
+SECTORS = ["XLK", "XLF", "XLE"]
+WINDOW = 252
+
+prices = fetch_prices(TICKERS, start="2018-01-01")
+
+strategies = pd.DataFrame({
+    "TrendMR": combine_strategies(
+        prices, trend_params=(20, 100), mr_params=(20, 1.0), w_trend=0.7, w_mr=0.3,
+        cost_per_trade=0.0005, target_ann_vol=0.14,
+    )["Portfolio"],
+    "CS_Momentum": run_cs_momentum(
+        prices, lookback_days=126, skip_days=21, top_n=5, bottom_n=5, cost_per_1x_turnover=0.0005,
+    )["Portfolio"],
+})
+strategies["FullPortfolio"] = strategies[["TrendMR", "CS_Momentum"]].mean(axis=1)
+
+factors = build_factor_returns(prices, market="SPY", rates=("TLT", "IEF"), sectors=SECTORS)
+
+rolling = rolling_factor_attribution(strategies, factors, window=WINDOW)
+expanding = rolling_factor_attribution(strategies, factors, window=None)
+
+print(f"\n=== FACTOR ATTRIBUTION (rolling {WINDOW}d, latest) ===")
+print(attribution_summary(rolling))
+print("\n=== FACTOR ATTRIBUTION (full sample) ===")
+print(attribution_summary(expanding))
+
+rolling["beta"].to_csv("phase9_rolling_betas.csv")
+pd.concat({"alpha": rolling["alpha"], "r2": rolling["r2"], "resid_vol": rolling["resid_vol"]}, axis=1).to_csv(
+    "phase9_rolling_attribution.csv"
+)
+print("\nSaved: phase9_rolling_betas.csv, phase9_rolling_attribution.csv")
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+def build_factor_returns(
+    prices: pd.DataFrame,
+    market: str = "SPY",
+    rates=("TLT", "IEF"),
+    sectors=None,
+) -> pd.DataFrame:
+    """
+    Daily factor returns from the price panel:
+      MKT   = market ETF return
+      RATES = equal-weight return of the rates ETFs present
+      <sector> = sector ETF return minus market (sector excess)
+    """
+    rets = prices.pct_change()
+    out = {"MKT": rets[market]}
+
+    rates = [t for t in (rates or []) if t in rets.columns]
+    if rates:
+        out["RATES"] = rets[rates].mean(axis=1)
+
+    for s in sectors or []:
+        if s in rets.columns:
+            out[s] = rets[s] - rets[market]
+
+    return pd.DataFrame(out).iloc[1:]
+
+def rolling_factor_attribution(
+    strategy_returns: pd.DataFrame,
+    factor_returns: pd.DataFrame,
+    window: int | None = 252,
+    min_periods: int | None = None,
+    periods_per_year: float = TRADING_DAYS,
+) -> dict:
+    """
+    Rolling (or expanding, window=None) OLS of every strategy column on the
+    same factor set, with an intercept:
+
+      r_s,t = alpha_s + beta_s' f_t + e_s,t
+
+    Cross-product matrices X'X, X'Y and Y'Y are kept as running sums and a
+    window's value is the difference of two cumulative sums, so each step
+    costs O(k^2) for the shared X'X plus O(k * strategies) for X'Y. All
+    windows and strategies are then solved in one batched linear solve.
+
+    Factor rows with NaN are left out of every regression; NaN strategy
+    returns count as 0 (as in the runners' fillna(0) return series).
+
+    Returns a dict of DataFrames indexed by date:
+      "alpha"     annualized intercept (dates x strategies)
+      "beta"      columns (factor, strategy)
+      "r2"        dates x strategies
+      "resid_vol" annualized residual std (dates x strategies)
+      "n_obs"     observations in each window (Series)
+    """
+    idx = strategy_returns.index.intersection(factor_returns.index)
+    Y = strategy_returns.loc[idx].to_numpy(dtype=float)
+    F = factor_returns.loc[idx].to_numpy(dtype=float)
+
+    ok = np.isfinite(F).all(axis=1)
+    X = np.column_stack([np.ones(len(idx)), np.where(ok[:, None], F, 0.0)]) * ok[:, None]
+    Y = np.nan_to_num(Y) * ok[:, None]
+    n_dates, p = X.shape
+    min_periods = (window if window is not None else p + 2) if min_periods is None else min_periods
+    min_periods = max(min_periods, p + 1)
+
+    def _window(c):
+        c = np.concatenate([np.zeros((1,) + c.shape[1:]), c])
+        if window is None:
+            return c[1:]
+        lag = np.maximum(np.arange(1, n_dates + 1) - window, 0)
+        return c[1:] - c[lag]
+
+    xx = _window(np.cumsum(X[:, :, None] * X[:, None, :], axis=0))  # (T, p, p)
+    xy = _window(np.cumsum(X[:, :, None] * Y[:, None, :], axis=0))  # (T, p, S)
+    yy = _window(np.cumsum(Y * Y, axis=0))                           # (T, S)
+    n = xx[:, 0, 0]
+
+    fit = n >= min_periods
+    coef = np.full(xy.shape, np.nan)
+    if fit.any():
+        try:
+            coef[fit] = np.linalg.solve(xx[fit], xy[fit])
+        except np.linalg.LinAlgError:
+            coef[fit] = np.linalg.pinv(xx[fit]) @ xy[fit]
+
+    # SSR = y'y - b'X'y ; SST = y'y - n * ybar^2 (ybar from the intercept row of X'y)
+    ssr = np.clip(yy - np.einsum("tps,tps->ts", coef, xy), 0.0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sst = yy - xy[:, 0, :] ** 2 / n[:, None]
+        r2 = np.where(sst > 0, 1.0 - ssr / sst, np.nan)
+        resid_var = ssr / (n - p)[:, None]
+
+    cols = strategy_returns.columns
+    factors = list(factor_returns.columns)
+    beta = pd.DataFrame(
+        coef[:, 1:, :].reshape(n_dates, -1),
+        index=idx,
+        columns=pd.MultiIndex.from_product([factors, cols], names=["factor", "strategy"]),
+    )
+
+    return {
+        "alpha": pd.DataFrame(coef[:, 0, :] * periods_per_year, index=idx, columns=cols),
+        "beta": beta,
+        "r2": pd.DataFrame(np.where(fit[:, None], r2, np.nan), index=idx, columns=cols),
+        "resid_vol": pd.DataFrame(
+            np.where(fit[:, None], np.sqrt(resid_var) * np.sqrt(periods_per_year), np.nan),
+            index=idx,
+            columns=cols,
+        ),
+        "n_obs": pd.Series(n, index=idx, name="n_obs"),
+    }
+
+def attribution_summary(attr: dict) -> pd.DataFrame:
+    """Last available alpha / betas / R^2 / residual vol per strategy."""
+    last = {
+        "alpha_ann": attr["alpha"].ffill().iloc[-1],
+        "r2": attr["r2"].ffill().iloc[-1],
+        "resid_vol_ann": attr["resid_vol"].ffill().iloc[-1],
+    }
+    factors = attr["beta"].columns.get_level_values("factor").unique()
+    betas = attr["beta"].ffill().iloc[-1].unstack("factor")[factors].add_prefix("beta_")
+    return pd.concat([pd.DataFrame(last), betas], axis=1)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import Callable, Iterable, Iterator
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+SESSION_MINUTES = 390  # US equities regular session, 09:30-16:00
+
+def bars_per_day(bar_freq: str = "1d") -> float:
+    """
+    Number of bars in one trading session for a bar frequency string:
+      "1d" / "D"             -> 1
+      "5min" / "5T"          -> 78
+      "1min"                 -> 390
+      "60min" / "1h" / "1H"  -> 6.5 (last bar of the session is a partial one)
+    """
+    f = bar_freq.strip().lower()
+    if f in ("d", "1d", "day", "daily"):
+        return 1.0
+    for suffix, minutes in (("min", 1), ("t", 1), ("h", 60)):
+        if f.endswith(suffix):
+            n = int(f[: -len(suffix)] or 1) * minutes
+            if n <= 0:
+                raise ValueError(f"Unsupported bar frequency: {bar_freq!r}")
+            return SESSION_MINUTES / n
+    raise ValueError(f"Unsupported bar frequency: {bar_freq!r}")
+
+def periods_per_year(bar_freq: str = "1d") -> float:
+    """Annualization factor (bars per year) for a bar frequency."""
+    return TRADING_DAYS * bars_per_day(bar_freq)
+
+def days_to_bars(days: int, bar_freq: str = "1d") -> int:
+    """Convert a window expressed in trading days to a number of bars."""
+    if days <= 0:
+        return 0
+    return max(1, int(round(days * bars_per_day(bar_freq))))
+
+def rebalance_rows(index: pd.DatetimeIndex, rebalance="M") -> np.ndarray:
+    """
+    Rows where portfolios are re-formed: the first bar of each calendar
+    period for a period alias ("D", "W", "M", "Q", ...), or every k-th bar
+    for an int k.
+    """
+    if isinstance(rebalance, (int, np.integer)):
+        if rebalance <= 0:
+            raise ValueError("rebalance interval must be positive")
+        return np.arange(0, len(index), int(rebalance))
+    periods = index.to_period(rebalance)
+    return np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+
+def read_bar_chunks(path: str, chunksize: int = 500_000) -> Iterator[pd.DataFrame]:
+    """
+    Stream a wide bar file (first column timestamps, one column per ticker)
+    in chunks of rows so the full history is never loaded at once.
+    """
+    for chunk in pd.read_csv(path, index_col=0, parse_dates=True, chunksize=chunksize):
+        yield chunk
+
+def resample_bars(chunks: Iterable[pd.DataFrame], rule: str = "5min") -> Iterator[pd.DataFrame]:
+    """
+    Streamed equivalent of df.resample(rule).last() for close prices
+    (empty buckets such as overnight gaps are skipped).
+
+    Chunks must arrive in time order. The last, possibly incomplete, bucket of
+    each chunk is carried into the next one, so buckets that span chunk
+    boundaries are aggregated correctly.
+    """
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk])
+        if chunk.empty:
+            continue
+
+        buckets = chunk.index.floor(rule)
+        last_bucket = buckets[-1]
+        done = buckets != last_bucket
+
+        carry = chunk[~done]
+        if done.any():
+            yield chunk[done].groupby(buckets[done]).last()
+
+    if carry is not None and not carry.empty:
+        yield carry.groupby(carry.index.floor(rule)).last()
+
+def run_chunked(
+    chunks: Iterable[pd.DataFrame],
+    fn: Callable[[pd.DataFrame], pd.DataFrame],
+    warmup: int,
+) -> Iterator[pd.DataFrame]:
+    """
+    Apply a rolling/backtest function chunk by chunk.
+
+    The last `warmup` rows of the previous chunk are prepended as history and
+    dropped from the output, so any fn whose row t depends only on the last
+    `warmup` rows (rolling windows, shift, pct_change, diff) gives the same
+    result as on the full history.
+    e.g. MA crossover -> positions -> costs needs warmup = long_window + 1.
+    """
+    tail = None
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        block = chunk if tail is None else pd.concat([tail, chunk])
+        out = fn(block)
+        yield out.iloc[len(block) - len(chunk):]
+        tail = block.iloc[-warmup:] if warmup > 0 else block.iloc[:0]
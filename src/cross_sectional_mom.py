@@ -2,6 +2,9 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from bars import days_to_bars, periods_per_year
+from strategy import performance_metrics
+
 TRADING_DAYS = 252
 
 def month_end_index(idx: pd.DatetimeIndex) -> pd.DatetimeIndex:
@@ -74,9 +77,214 @@ def run_cs_momentum(
     top_n: int = 2,
     bottom_n: int = 2,
     cost_per_1x_turnover: float = 0.0005,
+    bar_freq: str = "1d",
 ) -> pd.DataFrame:
+    """
+    lookback_days / skip_days are trading days, converted to bars for bar_freq.
+    Rebalancing stays on the first bar of each calendar month.
+    """
+    lookback_days = days_to_bars(lookback_days, bar_freq)
+    skip_days = days_to_bars(skip_days, bar_freq)
+
     rets = prices.pct_change().fillna(0.0)
     w = build_cs_mom_weights(prices, lookback_days, skip_days, top_n, bottom_n)
     port = (w * rets).sum(axis=1)
     port = apply_costs_from_weight_turnover(port, w, cost_per_1x_turnover)
     return port.to_frame("Portfolio")
+
+def momentum_surface(
+    prices: pd.DataFrame,
+    lookbacks=(63, 126, 189, 252),
+    skips=(0, 5, 21),
+    top_ns=(2, 3, 5),
+    bottom_ns=None,
+    cost_per_1x_turnover: float = 0.0005,
+    bar_freq: str = "1d",
+    return_series: bool = False,
+):
+    """
+    run_cs_momentum for every (lookback, skip, top_n, bottom_n) at once.
+
+    - one cumulative log-price array; score(lookback, skip) at a rebalance date
+      is a difference of two rows of it (same ranking as the simple return)
+    - each rebalance date is ranked once per (lookback, skip)
+    - every top_n / bottom_n portfolio is read off that ranking
+    bottom_ns=None means bottom_n = top_n; otherwise the full product is used.
+
+    Returns a metrics DataFrame indexed by (lookback, skip, top_n, bottom_n)
+    with the performance_metrics columns, plus the daily return matrix when
+    return_series=True. lookbacks / skips are trading days, converted to bars
+    for bar_freq as in run_cs_momentum (the index keeps the day values).
+    """
+    if bottom_ns is None:
+        pairs = [(n, n) for n in top_ns]
+    else:
+        pairs = [(t, b) for t in top_ns for b in bottom_ns]
+
+    logp = np.log(prices.to_numpy(dtype=float))
+    rets = prices.pct_change().fillna(0.0).to_numpy()
+    n_dates, n_tickers = logp.shape
+    if max(t + b for t, b in pairs) > n_tickers:
+        raise ValueError("top_n + bottom_n exceeds number of tickers")
+
+    months = prices.index.to_period("M")
+    new_month = np.r_[True, months[1:] != months[:-1]]
+    reb_rows = np.flatnonzero(new_month)
+    month_id = np.cumsum(new_month) - 1
+
+    # weights are applied next day: row t holds the weights of month_id[t - 1]
+    prev_month = np.r_[0, month_id[:-1]]
+    live = np.arange(n_dates) > 0
+    turnover_rows = reb_rows + 1
+    turnover_rows = turnover_rows[turnover_rows < n_dates]
+
+    # scores for all (lookback, skip): shape (L, S, months, tickers)
+    lb = np.asarray([days_to_bars(d, bar_freq) for d in lookbacks])[:, None, None]
+    sk = np.asarray([days_to_bars(d, bar_freq) for d in skips])[None, :, None]
+    end = reb_rows[None, None, :] - sk
+    start = end - lb
+    ok = start >= 0
+    scores = np.where(
+        ok[..., None],
+        logp[np.clip(end, 0, None)] - logp[np.clip(start, 0, None)],
+        np.nan,
+    )
+
+    order = np.argsort(-scores, axis=-1)  # NaN sorts last
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(n_tickers), axis=-1)
+    n_valid = np.isfinite(scores).sum(axis=-1, keepdims=True)
+
+    cols = {}
+    for i, lookback in enumerate(lookbacks):
+        for j, skip in enumerate(skips):
+            r = ranks[i, j]
+            nv = n_valid[i, j]
+            for top_n, bottom_n in pairs:
+                w = np.where(r < top_n, 1.0 / top_n, 0.0)
+                w = np.where((r >= nv - bottom_n) & (r < nv), -1.0 / bottom_n, w)
+                w[(nv < top_n + bottom_n)[:, 0]] = 0.0
+
+                port = np.einsum("tn,tn->t", w[prev_month], rets) * live
+
+                # turnover only changes on the day after each rebalance
+                dw = np.abs(np.diff(w, axis=0, prepend=np.zeros((1, n_tickers)))).sum(axis=1)
+                port[turnover_rows] -= dw[: len(turnover_rows)] * cost_per_1x_turnover
+
+                cols[(lookback, skip, top_n, bottom_n)] = port
+
+    port_ret = pd.DataFrame(cols, index=prices.index)
+    port_ret.columns.names = ["lookback", "skip", "top_n", "bottom_n"]
+
+    metrics = performance_metrics(port_ret, periods_per_year=periods_per_year(bar_freq)).reindex(port_ret.columns)
+    if return_series:
+        return metrics, port_ret
+    return metrics
+
+def cs_mom_universe_holdings(
+    prices: pd.DataFrame,
+    universe,
+    lookback_days: int = 126,
+    skip_days: int = 21,
+    top_n: int = 2,
+    bottom_n: int = 2,
+) -> pd.DataFrame:
+    """
+    build_cs_mom_weights restricted to point-in-time members.
+
+    On the first trading day of each month only the universe's active names
+    are scored and ranked, so work per rebalance scales with active members
+    rather than every column of prices. Holdings are returned in long form
+    (rebalance_date, ticker, weight) instead of a dense weight matrix; a name
+    that leaves the index mid-month is held until the next rebalance.
+    """
+    col_pos = pd.Index(prices.columns).get_indexer(universe.tickers)
+    px = prices.to_numpy(dtype=float)
+
+    months = prices.index.to_period("M")
+    reb_rows = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+
+    parts = []
+    for row in reb_rows:
+        end = row - skip_days
+        start = end - lookback_days
+        if start < 0:
+            continue
+
+        members = universe.active(prices.index[row])
+        cols = col_pos[members]
+        cols = cols[cols >= 0]  # members without a price column are skipped
+        if len(cols) < (top_n + bottom_n):
+            continue
+
+        score = px[end, cols] / px[start, cols] - 1.0
+        ok = np.isfinite(score)
+        cols, score = cols[ok], score[ok]
+        if len(cols) < (top_n + bottom_n):
+            continue
+
+        order = np.argsort(-score, kind="stable")
+        longs = cols[order[:top_n]]
+        shorts = cols[order[-bottom_n:]]
+
+        parts.append(pd.DataFrame({
+            "rebalance_date": prices.index[row],
+            "ticker": prices.columns[np.r_[longs, shorts]],
+            "weight": np.r_[np.full(top_n, 1.0 / top_n), np.full(bottom_n, -1.0 / bottom_n)],
+        }))
+
+    if not parts:
+        return pd.DataFrame(columns=["rebalance_date", "ticker", "weight"])
+    return pd.concat(parts, ignore_index=True)
+
+def run_cs_momentum_universe(
+    prices: pd.DataFrame,
+    universe,
+    lookback_days: int = 126,
+    skip_days: int = 21,
+    top_n: int = 2,
+    bottom_n: int = 2,
+    cost_per_1x_turnover: float = 0.0005,
+) -> pd.DataFrame:
+    """
+    run_cs_momentum on a membership-masked universe.
+    Portfolio returns are accumulated month by month over held names only
+    (next-day execution and turnover costs as in run_cs_momentum).
+    """
+    holdings = cs_mom_universe_holdings(prices, universe, lookback_days, skip_days, top_n, bottom_n)
+    rets = prices.pct_change().fillna(0.0).to_numpy()
+    col_pos = pd.Index(prices.columns)
+    n_dates = len(prices.index)
+
+    months = prices.index.to_period("M")
+    new_month = np.r_[True, months[1:] != months[:-1]]
+    reb_rows = np.flatnonzero(new_month)
+    month_end = np.r_[reb_rows[1:], n_dates]
+
+    port = np.zeros(n_dates)
+    prev_cols, prev_w = np.array([], dtype=int), np.array([])
+
+    by_date = {d: g for d, g in holdings.groupby("rebalance_date")}
+    for row, stop in zip(reb_rows, month_end):
+        g = by_date.get(prices.index[row])
+        if g is None:
+            cols, w = np.array([], dtype=int), np.array([])
+        else:
+            cols = col_pos.get_indexer(g["ticker"])
+            w = g["weight"].to_numpy()
+
+        # weights set at `row` apply from row + 1 through the first day of next month
+        lo, hi = row + 1, min(stop + 1, n_dates)
+        if lo < n_dates:
+            if len(cols):
+                port[lo:hi] += rets[lo:hi][:, cols] @ w
+            union = np.union1d(prev_cols, cols)
+            new = np.zeros(len(union))
+            old = np.zeros(len(union))
+            new[np.searchsorted(union, cols)] = w
+            old[np.searchsorted(union, prev_cols)] = prev_w
+            port[lo] -= np.abs(new - old).sum() * cost_per_1x_turnover
+
+        prev_cols, prev_w = cols, w
+
+    return pd.DataFrame({"Portfolio": port}, index=prices.index)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from strategy import performance_metrics
+
+TRADING_DAYS = 252
+
+def _decays(halflives) -> np.ndarray:
+    h = np.asarray(halflives, dtype=float)
+    if (h <= 0).any():
+        raise ValueError("halflives must be positive")
+    return np.exp(-np.log(2.0) / h)
+
+def _ewma_steps(x: np.ndarray, decays: np.ndarray):
+    """
+    Yield the (halflives x tickers) EWMA state for each row of x.
+
+    Same weights as pandas ewm(halflife=h).mean() (adjust=True,
+    ignore_na=False): numerator and denominator decay every bar, and only
+    observed values add to them, so a gap carries the last mean forward.
+    """
+    d = decays[:, None]
+    num = np.zeros((len(decays), x.shape[1]))
+    den = np.zeros_like(num)
+    for row in x:
+        ok = np.isfinite(row)
+        num *= d
+        den *= d
+        num += np.where(ok, row, 0.0)
+        den += ok
+        with np.errstate(invalid="ignore", divide="ignore"):
+            yield np.where(den > 0, num / den, np.nan)
+
+def ewma_means(prices: pd.DataFrame, halflives) -> dict[float, pd.DataFrame]:
+    """EWMA of every column for several half-lives in one recursive pass: {halflife: DataFrame}."""
+    x = prices.to_numpy(dtype=float)
+    out = np.empty((len(halflives),) + x.shape)
+    for t, m in enumerate(_ewma_steps(x, _decays(halflives))):
+        out[:, t] = m
+    return {h: pd.DataFrame(out[i], index=prices.index, columns=prices.columns) for i, h in enumerate(halflives)}
+
+def ewma_crossover_signals(prices: pd.DataFrame, fast_halflife: float = 10, slow_halflife: float = 50) -> pd.DataFrame:
+    """
+    moving_average_crossover_signals with exponential MAs:
+      1 = long (fast EWMA > slow EWMA), 0 = cash.
+    """
+    if fast_halflife >= slow_halflife:
+        raise ValueError("fast_halflife must be < slow_halflife")
+    means = ewma_means(prices, [fast_halflife, slow_halflife])
+    return (means[fast_halflife] > means[slow_halflife]).astype(int)
+
+def ewma_crossover_surface(
+    prices: pd.DataFrame,
+    fast_halflives=(2, 5, 10, 15, 20, 30),
+    slow_halflives=(40, 60, 80, 100, 150, 200),
+    cost_per_trade: float = 0.0005,
+    periods_per_year: float = TRADING_DAYS,
+    return_series: bool = False,
+):
+    """
+    Long/cash EWMA crossover backtest for every fast < slow half-life pair.
+
+    All half-lives share one (half-lives x tickers) state stepped through
+    time; at each bar every pair's signal, next-bar position, cost and
+    equal-weight portfolio return are read off that state, so no per-pair
+    signal matrix is ever stored. Timing and costs follow the MA grid in
+    run_phase4_walkforward.py (positions = signal.shift(1), cost per unit
+    position change, mean across tickers).
+
+    Returns a metrics DataFrame indexed by (fast, slow) with the
+    performance_metrics columns plus 'trades' (total position changes), and
+    the daily return matrix too when return_series=True.
+    """
+    fast = [float(h) for h in fast_halflives]
+    slow = [float(h) for h in slow_halflives]
+    hls = sorted(set(fast) | set(slow))
+    pos_of = {h: i for i, h in enumerate(hls)}
+    pairs = [(f, s) for f in fast for s in slow if f < s]
+    if not pairs:
+        raise ValueError("No fast < slow half-life pairs")
+    fi = np.array([pos_of[f] for f, _ in pairs])
+    si = np.array([pos_of[s] for _, s in pairs])
+
+    x = prices.to_numpy(dtype=float)
+    rets = prices.pct_change().fillna(0.0).to_numpy(dtype=float)
+    n_dates, n_tickers = x.shape
+
+    port = np.zeros((len(pairs), n_dates))
+    trades = np.zeros(len(pairs))
+    held = np.zeros((len(pairs), n_tickers))
+    for t, m in enumerate(_ewma_steps(x, _decays(hls))):
+        sig = (m[fi] > m[si]).astype(float)
+        if t + 1 < n_dates:
+            # signal at close t is held over bar t + 1
+            dpos = np.abs(sig - held)
+            port[:, t + 1] = (sig * rets[t + 1]).mean(axis=1) - dpos.mean(axis=1) * cost_per_trade
+            trades += dpos.sum(axis=1)
+            held = sig
+
+    port_ret = pd.DataFrame(port.T, index=prices.index, columns=pd.MultiIndex.from_tuples(pairs, names=["fast", "slow"]))
+    metrics = performance_metrics(port_ret, periods_per_year=periods_per_year).reindex(port_ret.columns)
+    metrics["trades"] = trades
+    if return_series:
+        return metrics, port_ret
+    return metrics
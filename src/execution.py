@@ -0,0 +1,177 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+# Path-dependent execution rules. Each function loops over time only; every
+# step works on a (configs x tickers) state array, so parameter sets and
+# tickers are vectorized together.
+
+def _as_configs(values, name: str) -> np.ndarray:
+    v = np.atleast_1d(np.asarray(values, dtype=float))
+    if v.ndim != 1 or len(v) == 0:
+        raise ValueError(f"{name} must be a scalar or a non-empty list")
+    return v
+
+def _frame(x: np.ndarray, index, labels, name: str) -> pd.DataFrame:
+    return pd.DataFrame(x.T, index=index, columns=pd.Index(labels, name=name))
+
+def trailing_stop_backtest(
+    signal: pd.DataFrame,
+    prices: pd.DataFrame,
+    stops=(0.05, 0.10, 0.20),
+    cost_per_trade: float = 0.0005,
+) -> dict:
+    """
+    backtest_long_only with a trailing stop, for several stop levels at once.
+
+    signal is the raw 1/0 signal (e.g. moving_average_crossover_signals).
+    Entering follows the signal with the usual one-day lag. While long, the
+    peak close since entry is tracked; a close below peak * (1 - stop) exits
+    on the next bar and the name stays flat until the signal turns off and on
+    again. stop=np.inf reproduces the plain backtest.
+
+    Returns dict of DataFrames (dates x stop):
+      "returns"   equal-weight portfolio return net of cost (strat_ret_cost.mean(axis=1))
+      "turnover"  mean |position change| across tickers
+    """
+    stops = _as_configs(stops, "stops")
+    sig = signal.reindex(index=prices.index, columns=prices.columns).fillna(0).to_numpy(dtype=float) > 0
+    px = prices.to_numpy(dtype=float)
+    rets = prices.pct_change().fillna(0.0).to_numpy(dtype=float)
+    n_dates, n_tickers = px.shape
+    n_cfg = len(stops)
+    floor = (1.0 - stops)[:, None]
+
+    held = np.zeros((n_cfg, n_tickers))
+    peak = np.full((n_cfg, n_tickers), np.nan)
+    blocked = np.zeros((n_cfg, n_tickers), dtype=bool)
+    port = np.zeros((n_cfg, n_dates))
+    turnover = np.zeros((n_cfg, n_dates))
+
+    for t in range(n_dates):
+        port[:, t] = (held * rets[t]).mean(axis=1)
+
+        # decide tomorrow's position from today's close
+        p = px[t]
+        s = sig[t]
+        blocked &= s                       # re-arm once the signal switches off
+        want = s & ~blocked
+        peak = np.where(held > 0, np.fmax(peak, p), p)
+        hit = (held > 0) & (p < peak * floor)
+        blocked |= hit
+        new = (want & ~hit).astype(float)
+
+        if t + 1 < n_dates:
+            # cost is charged on the bar the new position is first held
+            turnover[:, t + 1] = np.abs(new - held).mean(axis=1)
+            held = new
+
+    port -= turnover * cost_per_trade
+    labels = list(stops)
+    return {
+        "returns": _frame(port, prices.index, labels, "stop"),
+        "turnover": _frame(turnover, prices.index, labels, "stop"),
+    }
+
+def no_trade_band_backtest(
+    target_weights: pd.DataFrame,
+    prices: pd.DataFrame,
+    bands=(0.0, 0.01, 0.02, 0.05),
+    cost_per_1x_turnover: float = 0.0005,
+    drift: bool = True,
+) -> dict:
+    """
+    Rebalance a name only when its weight is more than `band` away from target.
+    Opening, closing or flipping a position always trades, so the band only
+    suppresses resizes of a name already held on the target's side.
+
+    target_weights[t] is the desired weight over bar t (already lagged, e.g.
+    build_cs_mom_weights or positions / N). With drift=True held weights move
+    with returns between rebalances (w * (1 + r) / (1 + port_r)); with
+    drift=False and band=0 the result equals the repo's weight backtest
+    ((w * rets).sum(axis=1) minus apply_costs_from_weight_turnover).
+
+    Returns dict of DataFrames (dates x band): "returns", "turnover".
+    """
+    bands = _as_configs(bands, "bands")[:, None]
+    W = target_weights.reindex(index=prices.index, columns=prices.columns).fillna(0.0).to_numpy(dtype=float)
+    rets = prices.pct_change().fillna(0.0).to_numpy(dtype=float)
+    n_dates, n_tickers = W.shape
+    n_cfg = len(bands)
+
+    held = np.zeros((n_cfg, n_tickers))
+    port = np.zeros((n_cfg, n_dates))
+    turnover = np.zeros((n_cfg, n_dates))
+
+    for t in range(n_dates):
+        target = W[t]
+        move = np.abs(held - target) > bands
+        # entries, exits and side flips always trade; the band only gates resizing
+        move |= np.sign(held) != np.sign(target)
+        new = np.where(move, target, held)
+        turnover[:, t] = np.abs(new - held).sum(axis=1)
+        held = new
+
+        r = held @ rets[t]
+        port[:, t] = r - turnover[:, t] * cost_per_1x_turnover
+        if drift:
+            denom = 1.0 + r
+            held = np.where(denom[:, None] != 0, held * (1.0 + rets[t]) / denom[:, None], held)
+
+    labels = list(bands[:, 0])
+    return {
+        "returns": _frame(port, prices.index, labels, "band"),
+        "turnover": _frame(turnover, prices.index, labels, "band"),
+    }
+
+def turnover_budget_backtest(
+    target_weights: pd.DataFrame,
+    prices: pd.DataFrame,
+    budgets=(0.5, 1.0, 2.0),
+    period: str = "M",
+    cost_per_1x_turnover: float = 0.0005,
+) -> dict:
+    """
+    Cap total traded weight per calendar period (default monthly).
+
+    Each bar the desired trade target - held is scaled down uniformly if it
+    exceeds what is left of the period's budget; the budget resets at the
+    start of every period. budget=np.inf reproduces the unconstrained
+    weight backtest.
+
+    Returns dict of DataFrames (dates x budget): "returns", "turnover".
+    """
+    budgets = _as_configs(budgets, "budgets")
+    W = target_weights.reindex(index=prices.index, columns=prices.columns).fillna(0.0).to_numpy(dtype=float)
+    rets = prices.pct_change().fillna(0.0).to_numpy(dtype=float)
+    n_dates, n_tickers = W.shape
+    n_cfg = len(budgets)
+
+    periods = prices.index.to_period(period)
+    new_period = np.r_[True, periods[1:] != periods[:-1]]
+
+    held = np.zeros((n_cfg, n_tickers))
+    left = budgets.copy()
+    port = np.zeros((n_cfg, n_dates))
+    turnover = np.zeros((n_cfg, n_dates))
+
+    for t in range(n_dates):
+        if new_period[t]:
+            left = budgets.copy()
+        trade = W[t] - held
+        size = np.abs(trade).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(size > left, left / size, 1.0)
+        trade *= scale[:, None]
+        used = size * scale
+        left = left - used
+        held = held + trade
+
+        turnover[:, t] = used
+        port[:, t] = held @ rets[t] - used * cost_per_1x_turnover
+
+    labels = list(budgets)
+    return {
+        "returns": _frame(port, prices.index, labels, "budget"),
+        "turnover": _frame(turnover, prices.index, labels, "budget"),
+    }
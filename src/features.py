@@ -2,6 +2,8 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from rolling import rolling_std
+
 TRADING_DAYS = 252
 
 def compute_returns(prices: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
@@ -17,16 +19,17 @@ def compute_returns(prices: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     log = np.log1p(simple)
     return simple, log
 
-def summary_stats(returns: pd.DataFrame) -> pd.DataFrame:
+def summary_stats(returns: pd.DataFrame, periods_per_year: float = TRADING_DAYS) -> pd.DataFrame:
     """
     Basic annualized stats:
       mean return, vol, Sharpe (rf=0), min/max daily return
+    periods_per_year: bars per year (see bars.periods_per_year for intraday).
     """
     mu_daily = returns.mean()
     vol_daily = returns.std()
 
-    mu_ann = mu_daily * TRADING_DAYS
-    vol_ann = vol_daily * np.sqrt(TRADING_DAYS)
+    mu_ann = mu_daily * periods_per_year
+    vol_ann = vol_daily * np.sqrt(periods_per_year)
     sharpe = (mu_ann / vol_ann).replace([np.inf, -np.inf], np.nan)
 
     out = pd.DataFrame({
@@ -38,6 +41,6 @@ def summary_stats(returns: pd.DataFrame) -> pd.DataFrame:
     })
     return out.sort_values("sharpe_rf0", ascending=False)
 
-def rolling_vol(returns: pd.DataFrame, window: int = 20) -> pd.DataFrame:
-    """Annualized rolling volatility."""
-    return returns.rolling(window).std() * np.sqrt(TRADING_DAYS)
+def rolling_vol(returns: pd.DataFrame, window: int = 20, periods_per_year: float = TRADING_DAYS) -> pd.DataFrame:
+    """Annualized rolling volatility (window in bars)."""
+    return rolling_std(returns, window) * np.sqrt(periods_per_year)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from bars import rebalance_rows
+from cross_sectional_mom import apply_costs_from_weight_turnover
+
+def correlation_distance(corr: np.ndarray) -> np.ndarray:
+    """d_ij = sqrt((1 - rho_ij) / 2), the usual HRP distance."""
+    return np.sqrt(np.clip(0.5 * (1.0 - corr), 0.0, None))
+
+def single_linkage_order(dist: np.ndarray) -> np.ndarray:
+    """
+    Quasi-diagonal leaf order of the single-linkage dendrogram.
+
+    Single linkage merges along the minimum spanning tree, so the tree is
+    built with a vectorized Prim pass (O(N^2), one argmin per added node)
+    and its edges are then merged in increasing distance, each cluster
+    keeping its leaves in dendrogram order.
+    """
+    n = dist.shape[0]
+    if n == 1:
+        return np.zeros(1, dtype=int)
+
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    best = dist[0].astype(float).copy()
+    best[0] = np.inf
+    parent = np.zeros(n, dtype=int)
+    edges = np.empty((n - 1, 2), dtype=int)
+    weights = np.empty(n - 1)
+    for k in range(n - 1):
+        j = int(np.argmin(np.where(in_tree, np.inf, best)))
+        edges[k] = parent[j], j
+        weights[k] = best[j]
+        in_tree[j] = True
+        closer = (dist[j] < best) & ~in_tree
+        best[closer] = dist[j][closer]
+        parent[closer] = j
+
+    root = np.arange(n)
+    leaves = {i: [i] for i in range(n)}
+
+    def find(i):
+        while root[i] != i:
+            root[i] = root[root[i]]
+            i = root[i]
+        return i
+
+    for k in np.argsort(weights, kind="stable"):
+        a, b = find(edges[k, 0]), find(edges[k, 1])
+        if len(leaves[a]) < len(leaves[b]):
+            a, b = b, a
+        leaves[a] = leaves[a] + leaves.pop(b)
+        root[b] = a
+    return np.asarray(leaves[find(0)], dtype=int)
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    # concatenation of arange(s, e) for every segment
+    lens = ends - starts
+    offsets = np.repeat(np.cumsum(lens) - lens, lens)
+    return np.arange(lens.sum()) - offsets + np.repeat(starts, lens)
+
+def recursive_bisection(cov: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """
+    HRP weights for a covariance matrix and a quasi-diagonal order.
+
+    Each cluster's variance under inverse-variance weights is
+      (sum of C_ij / (s_i s_j) over the block) / (sum of 1 / s_i)^2
+    with s = diag(C), so one 2-D prefix sum of the reordered matrix gives
+    every cluster variance in O(1), and all clusters on a level of the
+    bisection are split at once.
+    """
+    n = len(order)
+    C = cov[np.ix_(order, order)]
+    iv = 1.0 / np.diag(C)
+    P = np.zeros((n + 1, n + 1))
+    P[1:, 1:] = (C * iv[:, None] * iv[None, :]).cumsum(axis=0).cumsum(axis=1)
+    S = np.r_[0.0, np.cumsum(iv)]
+
+    def cluster_var(a, b):
+        block = P[b, b] - P[a, b] - P[b, a] + P[a, a]
+        return block / (S[b] - S[a]) ** 2
+
+    w = np.ones(n)
+    a, b = np.array([0]), np.array([n])
+    while len(a):
+        mid = (a + b) // 2
+        v1, v2 = cluster_var(a, mid), cluster_var(mid, b)
+        alpha = 1.0 - v1 / (v1 + v2)
+        w[_ranges(a, mid)] *= np.repeat(alpha, mid - a)
+        w[_ranges(mid, b)] *= np.repeat(1.0 - alpha, b - mid)
+
+        a, b = np.r_[a, mid], np.r_[mid, b]
+        split = b - a > 1
+        a, b = a[split], b[split]
+
+    out = np.empty(n)
+    out[order] = w
+    return out
+
+def hrp_weights(cov: np.ndarray, order: np.ndarray | None = None) -> np.ndarray:
+    """Long-only HRP weights (sum to 1); the order is recomputed from cov unless given."""
+    cov = np.asarray(cov, dtype=float)
+    if order is None:
+        sd = np.sqrt(np.diag(cov))
+        order = single_linkage_order(correlation_distance(cov / np.outer(sd, sd)))
+    return recursive_bisection(cov, order)
+
+def hrp_rebalance_weights(
+    prices: pd.DataFrame,
+    lookback: int = 252,
+    rebalance="M",
+    reuse_tol: float = 0.05,
+) -> pd.DataFrame:
+    """
+    HRP weights re-estimated on every rebalance row from the trailing
+    `lookback` bars of returns (names without a full window get 0).
+
+    The cluster order is only rebuilt when the set of eligible names changes
+    or the mean absolute change in off-diagonal correlation since the last
+    rebuild exceeds reuse_tol; otherwise the previous order is reused and
+    only the bisection (cheap) is redone on the new covariance.
+
+    Weights are held until the next rebalance and lagged one bar, like
+    build_cs_mom_weights. .attrs has n_rebalances and n_rebuilds.
+    """
+    rets = prices.pct_change().to_numpy(dtype=float)[1:]
+    n_dates, n_tickers = prices.shape
+    reb = rebalance_rows(prices.index, rebalance)
+
+    W = np.zeros((len(reb), n_tickers))
+    tree_active, tree_corr, tree_order = None, None, None
+    n_done = n_rebuilds = 0
+    for k, row in enumerate(reb):
+        if row < lookback:
+            continue
+        X = rets[row - lookback : row]  # returns up to the close of `row`
+        Xc = X - X.mean(axis=0)
+        var = (Xc * Xc).sum(axis=0) / (lookback - 1)
+        active = np.isfinite(var) & (var > 0)
+        if active.sum() < 2:
+            continue
+
+        Xa = Xc[:, active]
+        cov = Xa.T @ Xa / (lookback - 1)
+        sd = np.sqrt(np.diag(cov))
+        corr = cov / np.outer(sd, sd)
+
+        m = corr.shape[0]
+        reuse = (
+            tree_active is not None
+            and np.array_equal(active, tree_active)
+            and np.abs(corr - tree_corr).sum() / (m * (m - 1)) < reuse_tol
+        )
+        if not reuse:
+            tree_order = single_linkage_order(correlation_distance(corr))
+            tree_active, tree_corr = active, corr
+            n_rebuilds += 1
+
+        W[k, active] = recursive_bisection(cov, tree_order)
+        n_done += 1
+
+    period_id = np.cumsum(np.isin(np.arange(n_dates), reb)) - 1
+    w = pd.DataFrame(W[period_id], index=prices.index, columns=prices.columns).shift(1).fillna(0.0)
+    w.attrs.update(n_rebalances=n_done, n_rebuilds=n_rebuilds)
+    return w
+
+def run_hrp(
+    prices: pd.DataFrame,
+    lookback: int = 252,
+    rebalance="M",
+    reuse_tol: float = 0.05,
+    cost_per_1x_turnover: float = 0.0005,
+) -> pd.DataFrame:
+    """Long-only HRP portfolio returns net of turnover costs, column 'Portfolio'."""
+    w = hrp_rebalance_weights(prices, lookback, rebalance, reuse_tol)
+    port = (w * prices.pct_change().fillna(0.0)).sum(axis=1)
+    port = apply_costs_from_weight_turnover(port, w, cost_per_1x_turnover).to_frame("Portfolio")
+    port.attrs.update(w.attrs)
+    return port
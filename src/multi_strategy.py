@@ -2,16 +2,22 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from bars import days_to_bars, periods_per_year
+from rolling import rolling_moments, rolling_order_stats, rolling_std
+from risk import portfolio_vol_scale
+from vol_forecast import forecast_vol
+
 TRADING_DAYS = 252
+MAD_TO_STD = 1.4826  # MAD -> std for normal data
 
 def zscore(x: pd.Series, window: int) -> pd.Series:
-    m = x.rolling(window).mean()
-    s = x.rolling(window).std()
-    return (x - m) / s
+    means, stds = rolling_moments(x, [window])
+    return (x - means[window]) / stds[window]
 
 def trend_signal_ma(prices: pd.DataFrame, short_w: int = 20, long_w: int = 100) -> pd.DataFrame:
-    short_ma = prices.rolling(short_w).mean()
-    long_ma  = prices.rolling(long_w).mean()
+    means, _ = rolling_moments(prices, [short_w, long_w], stds=False)
+    short_ma = means[short_w]
+    long_ma  = means[long_w]
     # 1 long, 0 cash
     sig = (short_ma > long_ma).astype(int)
     return sig
@@ -23,11 +29,23 @@ def mean_reversion_signal(prices: pd.DataFrame, window: int = 20, entry_z: float
     - if z < -entry_z => long (expect rebound)
     - if z > +entry_z => cash (or could short; we keep long/cash to stay simple)
     """
-    sig = pd.DataFrame(index=prices.index, columns=prices.columns, dtype=float)
-    for c in prices.columns:
-        z = zscore(prices[c], window)
-        sig[c] = (z < -entry_z).astype(int)
-    return sig
+    z = zscore(prices, window)
+    return (z < -entry_z).astype(int)
+
+def robust_zscore(x, window: int):
+    """
+    (x - rolling median) / (1.4826 * rolling MAD); one gap day barely moves it.
+    NaN where the MAD is 0 (over half the window at one price), like zscore
+    on a flat window, so stale prices never open a trade.
+    """
+    stats = rolling_order_stats(x, window, mad=True)
+    mad = stats["mad"].where(stats["mad"] > 0)
+    return (x - stats["median"]) / (MAD_TO_STD * mad)
+
+def robust_mean_reversion_signal(prices: pd.DataFrame, window: int = 20, entry_z: float = 1.0) -> pd.DataFrame:
+    """mean_reversion_signal on the median/MAD z-score instead of mean/std."""
+    z = robust_zscore(prices, window)
+    return (z < -entry_z).astype(int)
 
 def positions_from_signal(sig: pd.DataFrame) -> pd.DataFrame:
     # apply next day to avoid lookahead
@@ -41,14 +59,28 @@ def apply_transaction_costs(returns: pd.DataFrame, positions: pd.DataFrame, cost
 def asset_returns(prices: pd.DataFrame) -> pd.DataFrame:
     return prices.pct_change().fillna(0)
 
-def vol_target_weights(returns: pd.DataFrame, target_ann_vol: float = 0.12, window: int = 20) -> pd.DataFrame:
+def vol_target_weights(
+    returns: pd.DataFrame,
+    target_ann_vol: float = 0.12,
+    window: int = 20,
+    periods_per_year: float = TRADING_DAYS,
+    estimator: str = "rolling",
+) -> pd.DataFrame:
     """
     Per-asset volatility targeting (simple):
     weight_t = target_daily_vol / rolling_std
     Clipped to [0, 2] to prevent crazy leverage.
+    window is in bars; periods_per_year sets the per-bar target.
+    estimator "ewma", "garch" or "har" swaps the rolling std for a
+    vol_forecast.forecast_vol forecast. GARCH / HAR need a year of history
+    for their first fit, so the rolling std fills in until then and every
+    estimator starts trading after `window` bars.
     """
-    target_daily = target_ann_vol / np.sqrt(TRADING_DAYS)
-    vol = returns.rolling(window).std()
+    target_daily = target_ann_vol / np.sqrt(periods_per_year)
+    vol = rolling_std(returns, window)
+    if estimator != "rolling":
+        forecast = forecast_vol(returns, method=estimator, min_periods=window)
+        vol = forecast.where(forecast.notna(), vol)
     w = target_daily / vol
     w = w.clip(lower=0.0, upper=2.0).fillna(0.0)
     return w
@@ -61,9 +93,19 @@ def combine_strategies(
     w_mr: float = 0.4,
     cost_per_trade: float = 0.0005,
     target_ann_vol: float = 0.12,
+    vol_window: int = 20,
+    bar_freq: str = "1d",
+    vol_mode: str = "per_asset",
+    cov_method: str = "full",
+    cov_halflife: int = 60,
+    return_legs: bool = False,
+    mr_method: str = "zscore",
+    vol_estimator: str = "rolling",
 ) -> pd.DataFrame:
     """
     Returns daily portfolio returns series as DataFrame with column 'Portfolio'.
+    Windows (trend_params, mr window, vol_window) are in trading days and are
+    converted to bars for bar_freq (e.g. "5min"), as is the vol target.
     Pipeline:
     - build trend & mean reversion signals (long/cash)
     - convert to positions (next day)
@@ -71,14 +113,30 @@ def combine_strategies(
     - apply transaction costs
     - volatility target each leg
     - combine legs by weights
+    vol_mode="portfolio" replaces the per-asset step: legs are equal-weighted
+    and the whole book is scaled by risk.portfolio_vol_scale (streaming
+    shrunk EWMA covariance of asset returns, cov_method "full" or "factor").
+    return_legs=True (per-asset mode only) returns the per-asset combined legs
+    instead; their row mean is the 'Portfolio' series.
+    mr_method="robust" builds the MR leg from robust_mean_reversion_signal
+    (rolling median / MAD) instead of the mean / std z-score.
+    vol_estimator is passed to vol_target_weights (per-asset mode).
     """
     rets = asset_returns(prices)
 
-    s_short, s_long = trend_params
+    s_short, s_long = (days_to_bars(d, bar_freq) for d in trend_params)
     mr_window, mr_entry = mr_params
+    mr_window = days_to_bars(mr_window, bar_freq)
+    vol_window = days_to_bars(vol_window, bar_freq)
+    ppy = periods_per_year(bar_freq)
 
     trend_sig = trend_signal_ma(prices, s_short, s_long)
-    mr_sig = mean_reversion_signal(prices, mr_window, mr_entry)
+    if mr_method == "zscore":
+        mr_sig = mean_reversion_signal(prices, mr_window, mr_entry)
+    elif mr_method == "robust":
+        mr_sig = robust_mean_reversion_signal(prices, mr_window, mr_entry)
+    else:
+        raise ValueError("mr_method must be 'zscore' or 'robust'")
 
     trend_pos = positions_from_signal(trend_sig)
     mr_pos = positions_from_signal(mr_sig)
@@ -89,9 +147,31 @@ def combine_strategies(
     trend_leg = apply_transaction_costs(trend_leg, trend_pos, cost_per_trade=cost_per_trade)
     mr_leg = apply_transaction_costs(mr_leg, mr_pos, cost_per_trade=cost_per_trade)
 
+    if vol_mode == "portfolio":
+        if return_legs:
+            raise ValueError("return_legs requires vol_mode='per_asset' (portfolio scaling is not per asset)")
+        n = prices.shape[1]
+        exposures = (w_trend * trend_pos + w_mr * mr_pos) / n
+        scale = portfolio_vol_scale(
+            rets,
+            exposures,
+            target_ann_vol=target_ann_vol,
+            halflife=days_to_bars(cov_halflife, bar_freq),
+            method=cov_method,
+            min_periods=vol_window,
+            periods_per_year=ppy,
+        )
+        combo = (w_trend * trend_leg.mean(axis=1) + w_mr * mr_leg.mean(axis=1)) * scale
+        return combo.to_frame("Portfolio")
+    if vol_mode != "per_asset":
+        raise ValueError("vol_mode must be 'per_asset' or 'portfolio'")
+
     # vol targeting (per asset), then equal-weight across assets
-    trend_w = vol_target_weights(trend_leg, target_ann_vol=target_ann_vol)
-    mr_w = vol_target_weights(mr_leg, target_ann_vol=target_ann_vol)
+    trend_w = vol_target_weights(trend_leg, target_ann_vol, vol_window, ppy, estimator=vol_estimator)
+    mr_w = vol_target_weights(mr_leg, target_ann_vol, vol_window, ppy, estimator=vol_estimator)
+
+    if return_legs:
+        return w_trend * (trend_leg * trend_w) + w_mr * (mr_leg * mr_w)
 
     trend_port = (trend_leg * trend_w).mean(axis=1)
     mr_port = (mr_leg * mr_w).mean(axis=1)
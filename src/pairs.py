@@ -0,0 +1,214 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from cross_sectional_mom import apply_costs_from_weight_turnover
+from rolling import rolling_moments_array
+
+# Engle-Granger (two variables, constant) asymptotic critical values, MacKinnon (2010)
+EG_CRITICAL = {0.01: -3.90, 0.05: -3.34, 0.10: -3.05}
+
+# -----------------------
+# Screening
+# -----------------------
+# For a pair (y=i, x=j) with hedge ratio b every regression series is
+# z = Z[:, i] - b * Z[:, j], so any cross product z_a . z_b is a quadratic
+# form in b over four entries of the shared Gram matrix G = Z'Z. The ADF
+# regressions of all pairs are therefore read off one matrix product.
+
+_STATE: dict = {}
+
+def _init_worker(gram, n_assets, n_blocks, n_obs):
+    _STATE.update(gram=gram, n_assets=n_assets, n_blocks=n_blocks, n_obs=n_obs)
+
+def _adf_block(args) -> np.ndarray:
+    i, j, beta = args
+    G, N, K, n_obs = _STATE["gram"], _STATE["n_assets"], _STATE["n_blocks"], _STATE["n_obs"]
+
+    a = np.arange(K)
+    ri, rj = a[None, :, None] * N + i[:, None, None], a[None, :, None] * N + j[:, None, None]
+    ci, cj = a[None, None, :] * N + i[:, None, None], a[None, None, :] * N + j[:, None, None]
+    b = beta[:, None, None]
+    M = G[ri, ci] - b * (G[ri, cj] + G[rj, ci]) + b * b * G[rj, cj]  # (pairs, K, K)
+
+    XtX, Xty, yty = M[:, :-1, :-1], M[:, :-1, -1], M[:, -1, -1]
+    k = K - 1
+    e0 = np.zeros((len(i), k, 1))
+    e0[:, 0] = 1.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sol = np.linalg.solve(XtX, np.concatenate([Xty[..., None], e0], axis=2))
+        coef, inv00 = sol[:, :, 0], sol[:, 0, 1]
+        rss = yty - (coef * Xty).sum(axis=1)
+        sigma2 = np.maximum(rss, 0.0) / (n_obs - k - 1)
+        t = coef[:, 0] / np.sqrt(sigma2 * inv00)
+    return np.column_stack([coef[:, 0], t])
+
+def screen_pairs(
+    prices: pd.DataFrame,
+    window: int = 252,
+    as_of=None,
+    min_corr: float = 0.7,
+    adf_lags: int = 1,
+    top: int | None = 50,
+    block_size: int = 20000,
+    n_jobs: int | None = None,
+) -> pd.DataFrame:
+    """
+    Engle-Granger screen of every pair over the `window` bars ending at as_of
+    (default: last date).
+
+    - names need a full window of prices; log prices are demeaned once
+    - prefilter: correlation of daily log returns >= min_corr
+    - hedge ratio: OLS of y on x (demeaned levels, y = earlier column)
+    - ADF on the spread with a constant and adf_lags lagged differences
+
+    The three steps use shared Gram matrices, so the per-pair work is
+    O(adf_lags^3); blocks of block_size pairs are solved across n_jobs
+    processes.
+
+    Returns pairs ranked by ADF t-stat (most negative first) with corr,
+    beta, adf_t, gamma, half_life (bars), spread_std and coint_5pct
+    (adf_t below the 5% Engle-Granger critical value). top=None keeps all.
+    """
+    hist = prices.loc[:as_of].iloc[-window:]
+    hist = hist.loc[:, hist.notna().all() & (hist > 0).all()]
+    if hist.shape[1] < 2 or len(hist) < window:
+        raise ValueError("Need a full window of prices for at least two tickers.")
+
+    logp = np.log(hist.to_numpy(dtype=float))
+    N = logp.shape[1]
+    X = logp - logp.mean(axis=0)
+
+    D = np.diff(logp, axis=0)
+    keep = D.std(axis=0) > 0
+    corr = np.full((N, N), np.nan)
+    if keep.sum() >= 2:
+        corr[np.ix_(keep, keep)] = np.corrcoef(D[:, keep].T)
+    i, j = np.triu_indices(N, k=1)
+    ok = corr[i, j] >= min_corr
+    i, j = i[ok], j[ok]
+    if len(i) == 0:
+        return pd.DataFrame(columns=["y", "x", "corr", "beta", "adf_t", "gamma", "half_life", "spread_std", "coint_5pct"])
+
+    G0 = X.T @ X
+    beta = G0[i, j] / G0[j, j]
+
+    # ADF design on rows t = adf_lags + 1 .. window - 1:
+    # blocks [lagged level, lagged diffs 1..p, current diff], centered (constant term)
+    p = int(adf_lags)
+    n_obs = len(D) - p
+    blocks = [logp[p:-1]] + [D[p - k : len(D) - k] for k in range(1, p + 1)] + [D[p:]]
+    Z = np.concatenate([b - b.mean(axis=0) for b in blocks], axis=1)
+    G = Z.T @ Z
+
+    tasks = [(i[s : s + block_size], j[s : s + block_size], beta[s : s + block_size]) for s in range(0, len(i), block_size)]
+    init = (G, N, len(blocks), n_obs)
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs <= 1 or len(tasks) == 1:
+        _init_worker(*init)
+        parts = [_adf_block(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=init) as ex:
+            parts = list(ex.map(_adf_block, tasks))
+    gamma, adf_t = np.concatenate(parts).T
+
+    spread_var = (G0[i, i] - 2 * beta * G0[i, j] + beta * beta * G0[j, j]) / (window - 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        half_life = np.where((gamma < 0) & (gamma > -1), -np.log(2.0) / np.log1p(gamma), np.inf)
+
+    names = hist.columns
+    out = pd.DataFrame({
+        "y": names[i],
+        "x": names[j],
+        "corr": corr[i, j],
+        "beta": beta,
+        "adf_t": adf_t,
+        "gamma": gamma,
+        "half_life": half_life,
+        "spread_std": np.sqrt(np.maximum(spread_var, 0.0)),
+        "coint_5pct": adf_t < EG_CRITICAL[0.05],
+    }).sort_values("adf_t", kind="stable").reset_index(drop=True)
+    return out if top is None else out.head(top)
+
+# -----------------------
+# Spread z-score strategy
+# -----------------------
+def pairs_weights(
+    prices: pd.DataFrame,
+    pairs: pd.DataFrame,
+    hedge_window: int = 60,
+    z_window: int = 20,
+    entry_z: float = 2.0,
+    exit_z: float = 0.5,
+) -> pd.DataFrame:
+    """
+    Portfolio weights for spread z-score trading of every pair at once.
+
+    pairs needs 'y' and 'x' columns (e.g. screen_pairs output). For each pair
+    the hedge ratio is a rolling OLS of log y on log x over hedge_window,
+    spread = log y - beta * log x, and z is the spread's z-score over
+    z_window. Enter long the spread when z < -entry_z, short when
+    z > entry_z, exit once |z| < exit_z. A long spread holds
+    +1 / (1 + |beta|) in y and -beta / (1 + |beta|) in x; each pair gets
+    1 / n_pairs of capital.
+
+    Rolling moments of all pairs come from one cumulative-sum pass; the
+    entry/exit state is stepped through time for all pairs together.
+    Weights are lagged one bar (like build_cs_mom_weights), so they plug
+    into (w * rets).sum(axis=1) and apply_costs_from_weight_turnover.
+    """
+    cols = pd.Index(prices.columns)
+    yi = cols.get_indexer(pairs["y"])
+    xi = cols.get_indexer(pairs["x"])
+    if (yi < 0).any() or (xi < 0).any():
+        raise ValueError("pairs reference tickers not in prices")
+
+    logp = np.log(prices.to_numpy(dtype=float))
+    y, x = logp[:, yi], logp[:, xi]
+    n_dates, n_pairs = y.shape
+
+    means, _ = rolling_moments_array(np.concatenate([y, x, x * y, x * x], axis=1), [hedge_window], stds=False)
+    my, mx, mxy, mxx = np.split(means[hedge_window], 4, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        beta = (mxy - mx * my) / (mxx - mx * mx)
+    spread = y - beta * x
+
+    m, s = rolling_moments_array(spread, [z_window])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (spread - m[z_window]) / s[z_window]
+
+    state = np.zeros(n_pairs)
+    side = np.zeros((n_dates, n_pairs))
+    for t in range(n_dates):
+        zt = z[t]
+        live = np.isfinite(zt) & np.isfinite(beta[t])
+        state = np.where(live, state, 0.0)
+        state = np.where((state != 0) & (np.abs(zt) < exit_z), 0.0, state)
+        state = np.where((state == 0) & (zt > entry_z), -1.0, state)
+        state = np.where((state == 0) & (zt < -entry_z), 1.0, state)
+        side[t] = state
+
+    b = np.nan_to_num(beta)
+    gross = 1.0 + np.abs(b)
+    w = np.zeros((n_dates, len(cols)))
+    scale = side / gross / n_pairs
+    np.add.at(w.T, yi, scale.T)
+    np.add.at(w.T, xi, (-b * scale).T)
+
+    return pd.DataFrame(w, index=prices.index, columns=prices.columns).shift(1).fillna(0.0)
+
+def run_pairs(
+    prices: pd.DataFrame,
+    pairs: pd.DataFrame,
+    hedge_window: int = 60,
+    z_window: int = 20,
+    entry_z: float = 2.0,
+    exit_z: float = 0.5,
+    cost_per_1x_turnover: float = 0.0005,
+) -> pd.DataFrame:
+    """pairs_weights backtest net of turnover costs, column 'Portfolio'."""
+    w = pairs_weights(prices, pairs, hedge_window, z_window, entry_z, exit_z)
+    port = (w * prices.pct_change().fillna(0.0)).sum(axis=1)
+    return apply_costs_from_weight_turnover(port, w, cost_per_1x_turnover).to_frame("Portfolio")
@@ -0,0 +1,335 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from multi_strategy import MAD_TO_STD
+from rolling import rolling_moments_array, rolling_order_stats_array
+
+TRADING_DAYS = 252
+
+# -----------------------
+# Path generation
+# -----------------------
+def joint_returns(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Simple returns on dates where every ticker has a price.
+    Rows are kept intact so resampling preserves cross-asset correlation.
+    """
+    rets = prices.dropna().pct_change().iloc[1:]
+    if rets.empty:
+        raise ValueError("Need at least two dates where all tickers have prices.")
+    return rets
+
+def block_bootstrap_indices(
+    n_obs: int,
+    n_steps: int,
+    n_paths: int,
+    block_len: int = 20,
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    Circular moving-block bootstrap row indices, shape (n_paths, n_steps).
+    Each path is a concatenation of blocks of consecutive historical dates.
+    """
+    if block_len < 1:
+        raise ValueError("block_len must be >= 1")
+    rng = np.random.default_rng() if rng is None else rng
+
+    n_blocks = -(-n_steps // block_len)
+    starts = rng.integers(0, n_obs, size=(n_paths, n_blocks, 1))
+    idx = (starts + np.arange(block_len)) % n_obs
+    return idx.reshape(n_paths, -1)[:, :n_steps]
+
+def fit_factor_model(rets: np.ndarray, n_factors: int = 3) -> dict:
+    """
+    PCA factor model: r_t = mu + B f_t + e_t
+    Returns loadings B (tickers x k), historical factor realizations f (dates x k)
+    and idiosyncratic residual std per ticker.
+    """
+    mu = rets.mean(axis=0)
+    x = rets - mu
+    n_factors = min(n_factors, x.shape[1])
+
+    _, _, vt = np.linalg.svd(x, full_matrices=False)
+    loadings = vt[:n_factors].T
+    factors = x @ loadings
+    resid = x - factors @ loadings.T
+
+    return {
+        "mu": mu,
+        "loadings": loadings,
+        "factors": factors,
+        "resid_std": resid.std(axis=0, ddof=1),
+    }
+
+def simulate_return_paths(
+    rets: np.ndarray,
+    n_steps: int,
+    n_paths: int,
+    method: str = "block",
+    block_len: int = 20,
+    n_factors: int = 3,
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    Synthetic joint return paths, shape (n_paths, n_steps, tickers).
+    method:
+      "block"  = block bootstrap of whole historical rows
+      "factor" = bootstrapped PCA factor returns + Gaussian idiosyncratic noise
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    n_obs = rets.shape[0]
+
+    if method == "block":
+        idx = block_bootstrap_indices(n_obs, n_steps, n_paths, block_len, rng)
+        return rets[idx]
+
+    if method == "factor":
+        fm = fit_factor_model(rets, n_factors)
+        idx = block_bootstrap_indices(n_obs, n_steps, n_paths, block_len, rng)
+        common = fm["factors"][idx] @ fm["loadings"].T
+        noise = rng.standard_normal(common.shape) * fm["resid_std"]
+        return fm["mu"] + common + noise
+
+    raise ValueError("method must be 'block' or 'factor'")
+
+def returns_to_prices(paths_ret: np.ndarray, start_prices: np.ndarray) -> np.ndarray:
+    """
+    Compound (paths, steps, tickers) returns into prices.
+    The first date is the starting price, so output has steps + 1 rows.
+    """
+    n_paths, _, n_tickers = paths_ret.shape
+    growth = np.cumprod(1.0 + paths_ret, axis=1)
+    first = np.ones((n_paths, 1, n_tickers))
+    return start_prices * np.concatenate([first, growth], axis=1)
+
+# -----------------------
+# Batched strategy logic (paths x dates x tickers)
+# -----------------------
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    return rolling_moments_array(x, [window], axis=1)[1][window]
+
+def _shift1(x: np.ndarray) -> np.ndarray:
+    # .shift(1).fillna(0) along the date axis
+    out = np.zeros_like(x)
+    out[:, 1:] = x[:, :-1]
+    return out
+
+def _pct_change(prices: np.ndarray) -> np.ndarray:
+    # .pct_change().fillna(0) along the date axis
+    out = np.zeros_like(prices)
+    out[:, 1:] = prices[:, 1:] / prices[:, :-1] - 1.0
+    return out
+
+def _trades(positions: np.ndarray) -> np.ndarray:
+    # .diff().abs().fillna(0) along the date axis
+    out = np.zeros_like(positions)
+    out[:, 1:] = np.abs(np.diff(positions, axis=1))
+    return out
+
+def batched_ma_crossover(
+    prices: np.ndarray,
+    short_window: int = 20,
+    long_window: int = 100,
+    cost_per_trade: float = 0.0005,
+) -> np.ndarray:
+    """
+    strategy.py pipeline on a (paths, dates, tickers) batch:
+    crossover signal -> next-day positions -> costs -> equal-weight portfolio.
+    Returns portfolio returns, shape (paths, dates).
+    """
+    if short_window >= long_window:
+        raise ValueError("short_window must be < long_window")
+
+    means, _ = rolling_moments_array(prices, [short_window, long_window], stds=False, axis=1)
+    with np.errstate(invalid="ignore"):
+        signal = (means[short_window] > means[long_window]).astype(float)
+    positions = _shift1(signal)
+    strat_ret = positions * _pct_change(prices) - _trades(positions) * cost_per_trade
+    return strat_ret.mean(axis=2)
+
+def _vol_target_weights(legs: np.ndarray, target_ann_vol: float, window: int = 20) -> np.ndarray:
+    target_daily = target_ann_vol / np.sqrt(TRADING_DAYS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = target_daily / _rolling_std(legs, window)
+    w = np.clip(w, 0.0, 2.0)
+    return np.nan_to_num(w, nan=0.0)
+
+def batched_combine_strategies(
+    prices: np.ndarray,
+    trend_params=(20, 100),
+    mr_params=(20, 1.0),
+    w_trend: float = 0.6,
+    w_mr: float = 0.4,
+    cost_per_trade: float = 0.0005,
+    target_ann_vol: float = 0.12,
+    mr_method: str = "zscore",
+) -> np.ndarray:
+    """
+    multi_strategy.combine_strategies on a (paths, dates, tickers) batch.
+    Returns portfolio returns, shape (paths, dates).
+    """
+    rets = _pct_change(prices)
+    s_short, s_long = trend_params
+    mr_window, mr_entry = mr_params
+
+    means, stds = rolling_moments_array(prices, [s_short, s_long, mr_window], axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        trend_sig = (means[s_short] > means[s_long]).astype(float)
+        if mr_method == "robust":
+            stats = rolling_order_stats_array(prices, mr_window, mad=True, axis=1)
+            mad = np.where(stats["mad"] > 0, stats["mad"], np.nan)  # as robust_zscore
+            z = (prices - stats["median"]) / (MAD_TO_STD * mad)
+        else:
+            z = (prices - means[mr_window]) / stds[mr_window]
+        mr_sig = (z < -mr_entry).astype(float)
+
+    trend_pos = _shift1(trend_sig)
+    mr_pos = _shift1(mr_sig)
+
+    trend_leg = trend_pos * rets - _trades(trend_pos) * cost_per_trade
+    mr_leg = mr_pos * rets - _trades(mr_pos) * cost_per_trade
+
+    trend_port = (trend_leg * _vol_target_weights(trend_leg, target_ann_vol)).mean(axis=2)
+    mr_port = (mr_leg * _vol_target_weights(mr_leg, target_ann_vol)).mean(axis=2)
+    return w_trend * trend_port + w_mr * mr_port
+
+def batched_cs_momentum(
+    prices: np.ndarray,
+    dates: pd.DatetimeIndex,
+    lookback_days: int = 126,
+    skip_days: int = 21,
+    top_n: int = 2,
+    bottom_n: int = 2,
+    cost_per_1x_turnover: float = 0.0005,
+) -> np.ndarray:
+    """
+    cross_sectional_mom.run_cs_momentum on a (paths, dates, tickers) batch.
+    Rebalances on the first trading day of each month.
+    Returns portfolio returns, shape (paths, dates).
+    """
+    n_paths, n_dates, n_tickers = prices.shape
+    if top_n + bottom_n > n_tickers:
+        raise ValueError("top_n + bottom_n exceeds number of tickers")
+
+    months = dates.to_period("M")
+    month_id = np.concatenate([[0], np.cumsum(months[1:] != months[:-1])])
+    reb_rows = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+
+    # score at each rebalance row: price(t - skip) / price(t - skip - lookback) - 1
+    end = reb_rows - skip_days
+    start = end - lookback_days
+    ok = start >= 0
+    scores = np.full((n_paths, len(reb_rows), n_tickers), np.nan)
+    scores[:, ok] = prices[:, end[ok]] / prices[:, start[ok]] - 1.0
+
+    order = np.argsort(-scores, axis=2)  # NaN sorts last
+    n_valid = np.isfinite(scores).sum(axis=2, keepdims=True)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(n_tickers), axis=2)
+
+    w_reb = np.zeros_like(scores)
+    w_reb[ranks < top_n] = 1.0 / top_n
+    w_reb[(ranks >= n_valid - bottom_n) & (ranks < n_valid)] = -1.0 / bottom_n
+    w_reb[np.broadcast_to(n_valid < top_n + bottom_n, w_reb.shape)] = 0.0
+
+    w = _shift1(w_reb[:, month_id])
+    port = (w * _pct_change(prices)).sum(axis=2)
+    turnover = _trades(w).sum(axis=2)
+    return port - turnover * cost_per_1x_turnover
+
+# -----------------------
+# Metrics + driver
+# -----------------------
+def batched_performance_metrics(port_ret: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    strategy.performance_metrics for each row of a (paths, dates) array.
+    """
+    mu_ann = port_ret.mean(axis=1) * TRADING_DAYS
+    vol_ann = port_ret.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = mu_ann / vol_ann
+    sharpe[~np.isfinite(sharpe)] = np.nan
+
+    eq = np.cumprod(1.0 + port_ret, axis=1)
+    max_dd = (eq / np.maximum.accumulate(eq, axis=1) - 1.0).min(axis=1)
+
+    return {"mean_ann": mu_ann, "vol_ann": vol_ann, "sharpe_rf0": sharpe, "max_drawdown": max_dd}
+
+def run_batched_strategy(kind: str, params: dict, prices: np.ndarray, dates: pd.DatetimeIndex) -> np.ndarray:
+    """
+    Dispatch one strategy spec on a (paths, dates, tickers) batch.
+    kind: "ma_crossover", "multi_strategy" or "cs_momentum".
+    """
+    if kind == "ma_crossover":
+        return batched_ma_crossover(prices, **params)
+    if kind == "multi_strategy":
+        return batched_combine_strategies(prices, **params)
+    if kind == "cs_momentum":
+        return batched_cs_momentum(prices, dates, **params)
+    raise ValueError(f"Unknown strategy kind: {kind}")
+
+def _simulate_chunk(args) -> pd.DataFrame:
+    rets, start_prices, dates, n_paths, seed, path_kwargs, strategies = args
+    rng = np.random.default_rng(seed)
+
+    paths_ret = simulate_return_paths(rets, len(dates) - 1, n_paths, rng=rng, **path_kwargs)
+    prices = returns_to_prices(paths_ret, start_prices)
+    del paths_ret
+
+    out = {}
+    for name, (kind, params) in strategies.items():
+        port = run_batched_strategy(kind, params, prices, dates)
+        for metric, values in batched_performance_metrics(port).items():
+            out[(name, metric)] = values
+
+    return pd.DataFrame(out)
+
+def simulate_strategies(
+    prices: pd.DataFrame,
+    strategies: dict[str, tuple[str, dict]],
+    n_paths: int = 1000,
+    method: str = "block",
+    block_len: int = 20,
+    n_factors: int = 3,
+    chunk_size: int = 250,
+    n_jobs: int | None = None,
+    seed: int = 7,
+) -> pd.DataFrame:
+    """
+    Run whole strategies on many synthetic price panels.
+
+    strategies maps a label to (kind, params), kind one of
+    "ma_crossover", "multi_strategy", "cs_momentum"; params are the keyword
+    arguments of the matching batched_* function.
+
+    Paths are generated and evaluated chunk_size at a time (memory bound is
+    ~chunk_size * dates * tickers floats per array) and chunks are spread over
+    n_jobs processes. Each chunk gets its own seed, so results do not depend on
+    n_jobs.
+
+    Returns one row per path, columns (strategy, metric).
+    """
+    clean = prices.dropna()
+    rets = joint_returns(prices).to_numpy()
+    start_prices = clean.iloc[0].to_numpy()
+    dates = clean.index
+    path_kwargs = {"method": method, "block_len": block_len, "n_factors": n_factors}
+
+    sizes = [min(chunk_size, n_paths - i) for i in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(rets, start_prices, dates, n, s, path_kwargs, strategies) for n, s in zip(sizes, seeds)]
+
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs <= 1 or len(tasks) == 1:
+        parts = [_simulate_chunk(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as ex:
+            parts = list(ex.map(_simulate_chunk, tasks))
+
+    out = pd.concat(parts, ignore_index=True)
+    out.columns = pd.MultiIndex.from_tuples(out.columns, names=["strategy", "metric"])
+    out.index.name = "path"
+    return out
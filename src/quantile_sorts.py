@@ -0,0 +1,160 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from bars import rebalance_rows
+from strategy import performance_metrics
+
+TRADING_DAYS = 252
+
+def row_ranks(x: np.ndarray) -> np.ndarray:
+    """
+    Cross-sectional ranks 0..n_valid-1 along the last axis (ascending), NaN
+    where x is NaN. One argsort for every date; NaN sorts last so valid names
+    always take the lowest ranks. Ties are broken by column order.
+    """
+    order = np.argsort(x, axis=-1, kind="stable")
+    ranks = np.empty(x.shape, dtype=float)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(x.shape[-1], dtype=float), x.shape), axis=-1)
+    ranks[np.isnan(x)] = np.nan
+    return ranks
+
+def rank_ic(scores: np.ndarray, fwd_returns: np.ndarray) -> np.ndarray:
+    """
+    Spearman correlation per row between scores and forward returns, over
+    names where both are present (Pearson correlation of the row ranks).
+    """
+    both = np.isfinite(scores) & np.isfinite(fwd_returns)
+    rs = row_ranks(np.where(both, scores, np.nan))
+    rf = row_ranks(np.where(both, fwd_returns, np.nan))
+    n = both.sum(axis=-1)
+
+    # both rank vectors are 0..n-1 on the joint mask, so their mean is (n-1)/2
+    mid = ((n - 1) / 2.0)[..., None]
+    rs = np.where(both, rs - mid, 0.0)
+    rf = np.where(both, rf - mid, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ic = (rs * rf).sum(axis=-1) / np.sqrt((rs * rs).sum(axis=-1) * (rf * rf).sum(axis=-1))
+    ic[n < 3] = np.nan
+    return ic
+
+def quantile_buckets(scores: np.ndarray, n_quantiles: int = 10) -> np.ndarray:
+    """
+    Quantile label per name and date: 1 = lowest scores, n_quantiles = highest,
+    0 = no score. Buckets split each date's valid names as evenly as possible.
+    """
+    r = row_ranks(scores)
+    n_valid = np.isfinite(scores).sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        b = np.floor(r * n_quantiles / n_valid) + 1
+    return np.where(np.isfinite(b), b, 0).astype(np.int64)
+
+def _bucket_sums(buckets: np.ndarray, values: np.ndarray, n_quantiles: int) -> np.ndarray:
+    # scatter-reduce values into (rows, quantile) cells in one bincount
+    n_rows = buckets.shape[0]
+    flat = (buckets + np.arange(n_rows)[:, None] * (n_quantiles + 1)).ravel()
+    out = np.bincount(flat, weights=values.ravel(), minlength=n_rows * (n_quantiles + 1))
+    return out.reshape(n_rows, n_quantiles + 1)[:, 1:]
+
+def quantile_portfolios(
+    scores: pd.DataFrame,
+    prices: pd.DataFrame,
+    n_quantiles: int = 10,
+    rebalance="M",
+    cost_per_1x_turnover: float = 0.0005,
+) -> dict:
+    """
+    Equal-weight N-quantile portfolios from any (dates x tickers) score matrix
+    (compute_momentum_scores, z-scores, ...).
+
+    On each rebalance row the names are bucketed by score as of that close;
+    holdings apply from the next bar until the next rebalance (same timing
+    as build_cs_mom_weights). Ranks, bucket returns and turnover are all
+    computed for every date at once: per-quantile sums are one bincount over
+    (date, bucket) cells.
+
+    Returns dict:
+      "returns"   dates x quantile (Q1 = lowest score), gross
+      "turnover"  dates x quantile, sum |w change| within each quantile book
+      "spread"    top minus bottom quantile, net of cost_per_1x_turnover
+      "ic"        rank IC per rebalance date: score vs return over the
+                  following holding period
+      "buckets"   rebalance dates x tickers quantile labels (0 = unscored)
+    """
+    if n_quantiles < 2:
+        raise ValueError("n_quantiles must be at least 2")
+    S = scores.reindex(index=prices.index, columns=prices.columns).to_numpy(dtype=float)
+    px = prices.to_numpy(dtype=float)
+    rets = prices.pct_change().fillna(0.0).to_numpy(dtype=float)
+    n_dates, n_tickers = px.shape
+
+    reb = rebalance_rows(prices.index, rebalance)
+    B = quantile_buckets(S[reb], n_quantiles)  # (rebalances, tickers)
+
+    # bucket held on bar t was formed at the last rebalance row strictly before t
+    period_id = np.cumsum(np.isin(np.arange(n_dates), reb)) - 1
+    held_id = np.r_[-1, period_id[:-1]]
+    live = held_id >= 0
+    held = np.zeros((n_dates, n_tickers), dtype=np.int64)
+    held[live] = B[held_id[live]]
+
+    counts = _bucket_sums(held, np.ones((n_dates, n_tickers)), n_quantiles)
+    sums = _bucket_sums(held, rets, n_quantiles)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        q_ret = np.where(counts > 0, sums / counts, 0.0)
+
+    # turnover per quantile on the first bar each new book is held
+    cnt_reb = _bucket_sums(B, np.ones(B.shape), n_quantiles)
+    w_of = np.zeros((len(reb), n_quantiles + 1))
+    with np.errstate(divide="ignore"):
+        w_of[:, 1:] = np.where(cnt_reb > 0, 1.0 / cnt_reb, 0.0)
+    w_new = np.take_along_axis(w_of, B, axis=1)
+    B_old = np.vstack([np.zeros((1, n_tickers), dtype=np.int64), B[:-1]])
+    w_old = np.take_along_axis(np.vstack([np.zeros((1, n_quantiles + 1)), w_of[:-1]]), B_old, axis=1)
+    same = B == B_old
+    tv = _bucket_sums(np.where(same, B, 0), np.abs(w_new - w_old), n_quantiles)
+    tv += _bucket_sums(np.where(same, 0, B), w_new, n_quantiles)
+    tv += _bucket_sums(np.where(same, 0, B_old), w_old, n_quantiles)
+
+    turnover = np.zeros((n_dates, n_quantiles))
+    first_held = reb + 1
+    ok = first_held < n_dates
+    turnover[first_held[ok]] = tv[ok]
+
+    # forward return over each holding period: close at rebalance -> close at next rebalance
+    end_rows = np.r_[reb[1:], n_dates - 1]
+    fwd = px[end_rows] / px[reb] - 1.0
+    ic = rank_ic(S[reb], fwd)
+    ic[end_rows <= reb] = np.nan
+
+    labels = pd.Index([f"Q{q}" for q in range(1, n_quantiles + 1)], name="quantile")
+    q_df = pd.DataFrame(q_ret, index=prices.index, columns=labels)
+    tv_df = pd.DataFrame(turnover, index=prices.index, columns=labels)
+    spread = q_df.iloc[:, -1] - q_df.iloc[:, 0] - (tv_df.iloc[:, -1] + tv_df.iloc[:, 0]) * cost_per_1x_turnover
+
+    return {
+        "returns": q_df,
+        "turnover": tv_df,
+        "spread": spread.rename("Spread"),
+        "ic": pd.Series(ic, index=prices.index[reb], name="rank_ic"),
+        "buckets": pd.DataFrame(B, index=prices.index[reb], columns=prices.columns),
+    }
+
+def quantile_summary(result: dict, periods_per_year: float = TRADING_DAYS) -> pd.DataFrame:
+    """
+    performance_metrics for every quantile and the spread, plus annualized
+    turnover, mean rank IC / IC t-stat and a monotonicity score (rank
+    correlation between quantile number and mean return) in .attrs.
+    """
+    rets = pd.concat([result["returns"], result["spread"]], axis=1)
+    out = performance_metrics(rets, periods_per_year=periods_per_year).reindex(rets.columns)
+    tv = result["turnover"].mean() * periods_per_year
+    tv["Spread"] = tv.iloc[-1] + tv.iloc[0]
+    out["turnover_ann"] = tv
+
+    ic = result["ic"].dropna()
+    q_mean = result["returns"].mean().to_numpy()
+    out.attrs["mean_ic"] = float(ic.mean())
+    out.attrs["ic_tstat"] = float(ic.mean() / ic.std(ddof=1) * np.sqrt(len(ic))) if len(ic) > 1 else float("nan")
+    out.attrs["monotonicity"] = float(rank_ic(np.arange(len(q_mean), dtype=float)[None, :], q_mean[None, :])[0])
+    return out
@@ -0,0 +1,146 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+def stationary_bootstrap_indices(
+    n_obs: int,
+    n_draws: int,
+    mean_block: float = 10.0,
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    Politis-Romano stationary bootstrap row indices, shape (n_draws, n_obs).
+    Blocks have geometric length with mean `mean_block` and wrap around.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    q = 1.0 / mean_block
+
+    new_block = rng.random((n_draws, n_obs)) < q
+    new_block[:, 0] = True
+    starts = rng.integers(0, n_obs, size=(n_draws, n_obs))
+
+    t = np.arange(n_obs)
+    last_start = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    block_origin = np.take_along_axis(starts, last_start, axis=1)
+    return (block_origin + t - last_start) % n_obs
+
+def bootstrap_counts(idx: np.ndarray) -> np.ndarray:
+    """How many times each row is drawn in each bootstrap sample, shape (n_draws, n_obs)."""
+    n_draws, n_obs = idx.shape
+    flat = (idx + np.arange(n_draws)[:, None] * n_obs).ravel()
+    return np.bincount(flat, minlength=n_draws * n_obs).reshape(n_draws, n_obs).astype(float)
+
+def stationary_bootstrap_variance(d: np.ndarray, mean_block: float = 10.0) -> np.ndarray:
+    """
+    Variance of sqrt(T) * mean under the stationary bootstrap (Politis-Romano
+    kernel over sample autocovariances), one value per column of d.
+    """
+    n = d.shape[0]
+    q = 1.0 / mean_block
+    x = d - d.mean(axis=0)
+    var = (x * x).sum(axis=0) / n
+
+    # kernel weights decay like (1-q)^i; stop once they are negligible
+    max_lag = min(n - 1, int(np.ceil(np.log(1e-10) / np.log(1.0 - q))) if q < 1 else 0)
+    for i in range(1, max_lag + 1):
+        k = (1.0 - i / n) * (1.0 - q) ** i + (i / n) * (1.0 - q) ** (n - i)
+        var += 2.0 * k * (x[i:] * x[:-i]).sum(axis=0) / n
+    return np.clip(var, 1e-300, None)
+
+# worker state, set once per process so the return matrix is not re-pickled per chunk
+_STATE: dict = {}
+
+def _init_worker(d, centers, omega, mean_block):
+    _STATE.update(d=d, centers=centers, omega=omega, mean_block=mean_block)
+
+def _bootstrap_chunk(args) -> np.ndarray:
+    n_draws, seed = args
+    d, centers, omega = _STATE["d"], _STATE["centers"], _STATE["omega"]
+    n_obs = d.shape[0]
+    rng = np.random.default_rng(seed)
+
+    idx = stationary_bootstrap_indices(n_obs, n_draws, _STATE["mean_block"], rng)
+    # gather-and-reduce for every config at once: bootstrap means = counts @ d / T
+    boot_means = bootstrap_counts(idx) @ d / n_obs
+    del idx
+
+    root_n = np.sqrt(n_obs)
+    out = np.empty((n_draws, 1 + len(centers)))
+    out[:, 0] = (root_n * (boot_means - d.mean(axis=0))).max(axis=1)  # White RC
+    for j, c in enumerate(centers):
+        z = root_n * (boot_means - c) / omega
+        out[:, 1 + j] = np.maximum(z.max(axis=1), 0.0)
+    return out
+
+def reality_check(
+    returns: pd.DataFrame,
+    benchmark: pd.Series | None = None,
+    n_boot: int = 10000,
+    mean_block: float = 10.0,
+    chunk_size: int = 500,
+    n_jobs: int | None = None,
+    seed: int = 7,
+) -> pd.DataFrame:
+    """
+    White's Reality Check and Hansen's SPA test over a (dates x configs)
+    return matrix. H0: no config beats the benchmark (default: zero return).
+
+    All configs share the same stationary-bootstrap resamples, and each draw's
+    per-config means come from one counts @ returns product. Draws are
+    processed chunk_size at a time across n_jobs processes, each chunk with its
+    own seed so results do not depend on n_jobs.
+
+    Returns one row per test:
+      RC        White (2000), unstudentized, centered at the sample mean
+      SPA_l / SPA_c / SPA_u   Hansen (2005) lower / consistent / upper p-values
+    with the test statistic, p-value and best config.
+    """
+    d = returns.fillna(0.0).to_numpy(dtype=float)
+    if benchmark is not None:
+        d = d - benchmark.reindex(returns.index).fillna(0.0).to_numpy(dtype=float)[:, None]
+    n_obs, _ = d.shape
+
+    mean = d.mean(axis=0)
+    omega = np.sqrt(stationary_bootstrap_variance(d, mean_block))
+    root_n = np.sqrt(n_obs)
+
+    # Hansen's recentering: lower / consistent / upper
+    threshold = -np.sqrt(2.0 * np.log(np.log(n_obs))) * omega / root_n
+    centers = [
+        np.maximum(mean, 0.0),
+        np.where(mean >= threshold, mean, 0.0),
+        mean,
+    ]
+
+    rc_stat = float((root_n * mean).max())
+    spa_stat = float(max((root_n * mean / omega).max(), 0.0))
+
+    sizes = [min(chunk_size, n_boot - i) for i in range(0, n_boot, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(sizes, seeds))
+
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs <= 1 or len(tasks) == 1:
+        _init_worker(d, centers, omega, mean_block)
+        parts = [_bootstrap_chunk(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=(d, centers, omega, mean_block)
+        ) as ex:
+            parts = list(ex.map(_bootstrap_chunk, tasks))
+    boot = np.concatenate(parts)
+
+    best_rc = returns.columns[int(np.argmax(mean))]
+    best_spa = returns.columns[int(np.argmax(mean / omega))]
+    rows = {
+        "RC": (rc_stat, float((boot[:, 0] >= rc_stat).mean()), best_rc),
+        "SPA_l": (spa_stat, float((boot[:, 1] >= spa_stat).mean()), best_spa),
+        "SPA_c": (spa_stat, float((boot[:, 2] >= spa_stat).mean()), best_spa),
+        "SPA_u": (spa_stat, float((boot[:, 3] >= spa_stat).mean()), best_spa),
+    }
+    out = pd.DataFrame.from_dict(rows, orient="index", columns=["statistic", "p_value", "best_config"])
+    out.attrs["n_configs"] = returns.shape[1]
+    out.attrs["n_boot"] = n_boot
+    return out
@@ -0,0 +1,273 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from rolling import rolling_mean, rolling_std
+
+TRADING_DAYS = 252
+
+# Regime labels are small ints per date (-1 = undefined, e.g. before the
+# 200-day MA exists); label names live in labels.attrs["names"].
+
+# -----------------------
+# Labels
+# -----------------------
+def build_regime_labels(
+    prices: pd.DataFrame,
+    market: str = "SPY",
+    rates: str | None = "TLT",
+    ma_window: int = 200,
+    vol_window: int = 20,
+    vol_bins: int = 3,
+    rates_window: int = 63,
+    lag: int = 1,
+) -> pd.DataFrame:
+    """
+    Integer regime labels for the whole panel, one column per dimension:
+      trend  0 = market below its ma_window MA, 1 = above
+      vol    terciles (vol_bins) of the market's vol_window realized vol,
+             a VIX proxy; breakpoints are full-sample (descriptive use)
+      rates  0 = rates down, 1 = rates up (the rates ETF fell over
+             rates_window bars); skipped if rates is None or not in prices
+    Labels are lagged `lag` bars, so a bar's return is attributed to the
+    regime known at the previous close.
+    """
+    px = prices[market]
+    ma = rolling_mean(px, ma_window)
+    trend = np.where(ma.notna(), px > ma, -1)
+
+    vol = rolling_std(px.pct_change(), vol_window)
+    edges = vol.quantile(np.linspace(0, 1, vol_bins + 1)[1:-1]).to_numpy()
+    vol_lab = np.where(vol.notna(), np.searchsorted(edges, vol.to_numpy(), side="right"), -1)
+
+    labels = {"trend": trend, "vol": vol_lab}
+    names = {"trend": ["below_ma", "above_ma"], "vol": _bin_names(vol_bins)}
+    if rates is not None and rates in prices.columns:
+        chg = prices[rates].pct_change(rates_window)
+        labels["rates"] = np.where(chg.notna(), chg < 0, -1)
+        names["rates"] = ["rates_down", "rates_up"]
+
+    out = pd.DataFrame(labels, index=prices.index).astype(np.int8)
+    out = out.shift(lag).fillna(-1).astype(np.int8)
+    out.attrs["names"] = names
+    return out
+
+def _bin_names(n: int) -> list[str]:
+    if n == 3:
+        return ["vol_low", "vol_mid", "vol_high"]
+    if n == 2:
+        return ["vol_low", "vol_high"]
+    return [f"vol_q{i + 1}" for i in range(n)]
+
+def cross_regimes(labels: pd.DataFrame, columns) -> pd.Series:
+    """
+    One label for every combination of the given dimensions (mixed-radix
+    code; -1 if any part is undefined), e.g. trend x vol -> 6 regimes.
+    The Series' attrs["names"] holds the combined names.
+    """
+    names = labels.attrs.get("names", {})
+    code = np.zeros(len(labels), dtype=int)
+    combo = [""]
+    undefined = np.zeros(len(labels), dtype=bool)
+    for c in columns:
+        k = len(names.get(c, [])) or int(labels[c].max()) + 1
+        parts = names.get(c, [str(i) for i in range(k)])
+        x = labels[c].to_numpy()
+        undefined |= x < 0
+        code = code * k + x
+        combo = [f"{a}|{b}" if a else b for a in combo for b in parts]
+    out = pd.Series(np.where(undefined, -1, code), index=labels.index, name="x".join(columns))
+    out.attrs["names"] = {out.name: combo}
+    return out
+
+# -----------------------
+# Metrics by regime
+# -----------------------
+def regime_metrics(
+    strategy_returns: pd.DataFrame,
+    labels,
+    periods_per_year: float = TRADING_DAYS,
+) -> pd.DataFrame:
+    """
+    performance_metrics (mean_ann, vol_ann, sharpe_rf0, max_drawdown) for
+    every strategy x regime of every label column, plus n_obs and
+    time_share (the regime's share of labelled bars).
+
+    labels: DataFrame of integer labels (build_regime_labels) or one
+    Series (cross_regimes); -1 rows are ignored. Each regime's drawdown
+    compounds only the bars spent in that regime, as if the returns were
+    sliced out and passed to performance_metrics.
+
+    All groups come from one stacked (row, group) list over the returns
+    matrix, sorted by group once: moments are segment sums and drawdowns
+    a segmented running max over the sorted rows. NaN returns are skipped
+    in the moments and count as 0 in drawdowns, as in performance_metrics.
+
+    Returns a DataFrame indexed by (dimension, regime, strategy).
+    """
+    if isinstance(labels, pd.Series):
+        labels = labels.to_frame()
+    idx = strategy_returns.index.intersection(labels.index)
+    R = strategy_returns.loc[idx].to_numpy(dtype=float)
+    L = labels.loc[idx].to_numpy(dtype=int)
+    names = labels.attrs.get("names", {})
+    n_strats = R.shape[1]
+
+    # group ids: dimension offset + label; one row per (date, dimension) with a label
+    sizes = np.maximum(L.max(axis=0) + 1, 0)
+    for d, c in enumerate(labels.columns):
+        sizes[d] = max(sizes[d], len(names.get(c, [])))
+    offsets = np.r_[0, np.cumsum(sizes)[:-1]]
+    rows, dims = np.nonzero(L >= 0)
+    gid = offsets[dims] + L[rows, dims]
+    n_groups = int(sizes.sum())
+
+    # rows sorted by group (stable, so time order is kept inside a group):
+    # every statistic is then a reduction over contiguous segments
+    order = np.argsort(gid, kind="stable")
+    g_sorted = gid[order]
+    XT = np.ascontiguousarray(R.T)[:, rows[order]]  # (strategies, rows): scans run along contiguous memory
+    ok = np.isfinite(XT)
+    XT = np.where(ok, XT, 0.0)
+
+    n = np.zeros((n_groups, n_strats))
+    s1, s2 = np.zeros_like(n), np.zeros_like(n)
+    max_dd = np.full((n_groups, n_strats), np.nan)
+    if len(gid):
+        starts = np.flatnonzero(np.r_[True, g_sorted[1:] != g_sorted[:-1]])
+        present = g_sorted[starts]
+        n[present] = np.add.reduceat(ok, starts, axis=1, dtype=float).T
+        s1[present] = np.add.reduceat(XT, starts, axis=1).T
+        s2[present] = np.add.reduceat(XT * XT, starts, axis=1).T
+        max_dd[present] = _segment_max_drawdown(XT, starts).T
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mu = s1 / n
+        var = (s2 - n * mu * mu) / (n - 1)
+        vol = np.sqrt(np.maximum(var, 0.0))
+        sharpe = mu * np.sqrt(periods_per_year) / vol
+    sharpe = np.where(np.isfinite(sharpe), sharpe, np.nan)
+
+    dim_n = np.bincount(dims, minlength=len(sizes))
+    counts = np.bincount(gid, minlength=n_groups)
+    keys = []
+    for d, c in enumerate(labels.columns):
+        parts = names.get(c, [])
+        keys += [(c, parts[k] if k < len(parts) else str(k)) for k in range(sizes[d])]
+    group_dim = np.repeat(np.arange(len(sizes)), sizes)
+
+    out = pd.DataFrame({
+        "mean_ann": (mu * periods_per_year).ravel(),
+        "vol_ann": (vol * np.sqrt(periods_per_year)).ravel(),
+        "sharpe_rf0": sharpe.ravel(),
+        "max_drawdown": max_dd.ravel(),
+        "n_obs": np.repeat(counts, n_strats),
+        "time_share": np.repeat(counts / np.maximum(dim_n[group_dim], 1), n_strats),
+    }, index=pd.MultiIndex.from_tuples(
+        [(c, r, s) for c, r in keys for s in strategy_returns.columns],
+        names=["dimension", "regime", "strategy"],
+    ))
+    return out[out["n_obs"] > 0]
+
+def _segment_max_drawdown(XT: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Max drawdown of the equity curve of every column segment
+    [starts[i], starts[i+1]) and row of XT (strategies x bars), with the
+    running peak reset at each segment start.
+    """
+    logeq = np.cumsum(np.log1p(XT), axis=1)
+    seg = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, XT.shape[1]]))
+    base = np.hstack([np.zeros((len(XT), 1)), logeq])[:, starts]
+    logeq -= base[:, seg]
+    # lift each segment above all earlier ones so one running max never crosses a boundary
+    span = np.nanmax(logeq) - np.nanmin(logeq) + 1.0
+    logeq += seg * span
+    return np.expm1(np.minimum.reduceat(logeq - np.maximum.accumulate(logeq, axis=1), starts, axis=1))
+
+# -----------------------
+# Transitions
+# -----------------------
+def regime_transitions(
+    labels: pd.Series,
+    strategy_returns: pd.DataFrame | None = None,
+    horizon: int = 20,
+) -> dict:
+    """
+    Transition statistics for one label Series (a build_regime_labels
+    column or cross_regimes output); -1 bars end a spell.
+
+    Returns a dict with
+      "matrix"  P(regime at t | regime at t-1), from x to
+      "spells"  per regime: n_spells, mean_length, max_length (bars)
+      "after_switch" (if strategy_returns is given), indexed by
+                (from, to, strategy): n_events, fwd_return (compounded
+                over the `horizon` bars from the switch) and mean /
+                worst max drawdown over that window (peak starts at the
+                switch). Switches with fewer than horizon bars left are
+                skipped.
+    """
+    name = labels.name
+    names = labels.attrs.get("names", {}).get(name)
+    x = labels.to_numpy(dtype=int)
+    k = max(int(x.max()) + 1, len(names or []), 1)
+    names = names or [str(i) for i in range(k)]
+
+    prev, cur = x[:-1], x[1:]
+    both = (prev >= 0) & (cur >= 0)
+    counts = np.bincount(prev[both] * k + cur[both], minlength=k * k).reshape(k, k)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        P = counts / counts.sum(axis=1, keepdims=True)
+    matrix = pd.DataFrame(P, index=pd.Index(names, name="from"), columns=pd.Index(names, name="to"))
+
+    # spells: runs of one defined label
+    brk = np.r_[True, x[1:] != x[:-1]]
+    starts = np.flatnonzero(brk)
+    lengths = np.diff(np.r_[starts, len(x)])
+    lab = x[starts]
+    keep = lab >= 0
+    n_spells = np.bincount(lab[keep], minlength=k)
+    tot = np.bincount(lab[keep], weights=lengths[keep], minlength=k)
+    longest = np.zeros(k)
+    np.maximum.at(longest, lab[keep], lengths[keep])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spells = pd.DataFrame(
+            {"n_spells": n_spells, "mean_length": tot / n_spells, "max_length": longest.astype(int)},
+            index=pd.Index(names, name="regime"),
+        )
+    out = {"matrix": matrix, "spells": spells}
+    if strategy_returns is None:
+        return out
+
+    # after each switch: returns of bars t .. t + horizon - 1 (t = first bar of the new regime)
+    R = strategy_returns.reindex(labels.index).fillna(0.0).to_numpy(dtype=float)
+    sw = np.flatnonzero(both & (prev != cur)) + 1
+    sw = sw[sw + horizon <= len(x)]
+    pair = x[sw - 1] * k + x[sw]
+
+    logeq = np.vstack([np.zeros((1, R.shape[1])), np.cumsum(np.log1p(R), axis=0)])
+    W = np.lib.stride_tricks.sliding_window_view(logeq, horizon + 1, axis=0)[sw]  # (events, strategies, horizon + 1)
+    W = W - W[..., :1]
+    fwd = np.expm1(W[..., -1])
+    mdd = np.expm1((W - np.maximum.accumulate(W, axis=2)).min(axis=2))
+
+    n_s = R.shape[1]
+    n_ev = np.bincount(pair, minlength=k * k)
+    flat = (pair[:, None] * n_s + np.arange(n_s)).ravel()
+    size = k * k * n_s
+    fwd_sum = np.bincount(flat, weights=fwd.ravel(), minlength=size).reshape(k * k, n_s)
+    dd_sum = np.bincount(flat, weights=mdd.ravel(), minlength=size).reshape(k * k, n_s)
+    dd_worst = np.zeros((k * k, n_s))
+    np.minimum.at(dd_worst, pair, mdd)
+
+    seen = np.flatnonzero(n_ev)
+    ev = n_ev[seen][:, None]
+    out["after_switch"] = pd.DataFrame({
+        "n_events": np.repeat(n_ev[seen], n_s),
+        "fwd_return": (fwd_sum[seen] / ev).ravel(),
+        "mean_max_dd": (dd_sum[seen] / ev).ravel(),
+        "worst_max_dd": dd_worst[seen].ravel(),
+    }, index=pd.MultiIndex.from_tuples(
+        [(names[p // k], names[p % k], s) for p in seen for s in strategy_returns.columns],
+        names=["from", "to", "strategy"],
+    ))
+    return out
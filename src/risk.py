@@ -0,0 +1,201 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+def halflife_to_lambda(halflife: float) -> float:
+    """EWMA decay for a half-life in bars."""
+    return 0.5 ** (1.0 / halflife)
+
+class EWMACovariance:
+    """
+    Streaming zero-mean EWMA covariance with Ledoit-Wolf style shrinkage.
+
+    Each update is a rank-one step  S <- lam * S + (1 - lam) * r r'  (O(N^2)).
+    Shrinkage pulls S toward mu * I (mu = average variance) with intensity
+
+      delta = sum(Var(r_i r_j)) / (n_eff * ||S - mu I||^2),  clipped to [0, 1]
+
+    sum(Var(r_i r_j)) = sum E[r_i^2 r_j^2] - ||S||^2, and the first term is an
+    EWMA of the scalar (r'r)^2, so no second N x N matrix is needed.
+    n_eff is the effective sample size of the EWMA weights.
+    """
+
+    def __init__(self, n_assets: int, halflife: float = 60.0, shrink: bool = True):
+        self.lam = halflife_to_lambda(halflife)
+        self.shrink = shrink
+        self.S = np.zeros((n_assets, n_assets))
+        self._tmp = np.empty_like(self.S)
+        self.trace = 0.0      # EWMA of r'r  (= trace of S)
+        self.fourth = 0.0     # EWMA of (r'r)^2
+        self.n_obs = 0
+        self._wsum = 0.0      # sum of EWMA weights so far, for bias correction
+
+    def update(self, r: np.ndarray) -> None:
+        r = np.nan_to_num(np.asarray(r, dtype=float))
+        a = 1.0 - self.lam
+        np.outer(a * r, r, out=self._tmp)
+        self.S *= self.lam
+        self.S += self._tmp
+        rr = float(r @ r)
+        self.trace = self.lam * self.trace + a * rr
+        self.fourth = self.lam * self.fourth + a * rr * rr
+        self._wsum = self.lam * self._wsum + a
+        self.n_obs += 1
+
+    def shrinkage(self) -> float:
+        if not self.shrink or self.n_obs < 2:
+            return 0.0
+        n = self.S.shape[0]
+        s_norm2 = float(np.vdot(self.S, self.S)) / self._wsum ** 2
+        mu = self.trace / self._wsum / n
+        pi = max(self.fourth / self._wsum - s_norm2, 0.0)
+        dist = s_norm2 - n * mu * mu
+        if dist <= 0:
+            return 1.0
+        n_eff = min((1.0 + self.lam) / (1.0 - self.lam), self.n_obs)
+        return float(np.clip(pi / (n_eff * dist), 0.0, 1.0))
+
+    def covariance(self) -> np.ndarray:
+        S = self.S / self._wsum
+        d = self.shrinkage()
+        if d == 0.0:
+            return S
+        mu = self.trace / self._wsum / S.shape[0]
+        return (1.0 - d) * S + d * mu * np.eye(S.shape[0])
+
+    def portfolio_var(self, w: np.ndarray) -> float:
+        if self.n_obs == 0:
+            return 0.0
+        w = np.nan_to_num(np.asarray(w, dtype=float))
+        q = float(w @ self.S @ w) / self._wsum
+        d = self.shrinkage()
+        if d == 0.0:
+            return q
+        mu = self.trace / self._wsum / self.S.shape[0]
+        return (1.0 - d) * q + d * mu * float(w @ w)
+
+class FactorEWMACovariance:
+    """
+    Low-rank streaming covariance for large universes:  Sigma ~ B F B' + diag(d)
+
+    - B: top principal components of the last `pca_window` returns,
+      re-estimated every `refresh` updates
+    - F: EWMA covariance of factor returns B' r (k x k rank-one updates)
+    - d: EWMA of residual variances
+    Each update and each portfolio variance costs O(N k).
+    """
+
+    def __init__(
+        self,
+        n_assets: int,
+        n_factors: int = 5,
+        halflife: float = 60.0,
+        pca_window: int = 252,
+        refresh: int = 63,
+    ):
+        self.lam = halflife_to_lambda(halflife)
+        self.k = min(n_factors, n_assets)
+        self.pca_window = pca_window
+        self.refresh = refresh
+        self.buf = np.zeros((pca_window, n_assets))
+        self.B = None
+        self.F = np.zeros((self.k, self.k))
+        self.d = np.zeros(n_assets)
+        self.n_obs = 0
+        self._wsum = 0.0
+
+    def _refit(self) -> None:
+        n = min(self.n_obs, self.pca_window)
+        x = self.buf[:n] if self.n_obs <= self.pca_window else self.buf
+        _, _, vt = np.linalg.svd(x, full_matrices=False)
+        self.B = vt[: self.k].T
+        f = x @ self.B
+        e = x - f @ self.B.T
+        self.F = f.T @ f / n
+        self.d = (e * e).mean(axis=0)
+        self._wsum = 1.0
+
+    def update(self, r: np.ndarray) -> None:
+        r = np.nan_to_num(np.asarray(r, dtype=float))
+        self.buf[self.n_obs % self.pca_window] = r
+        self.n_obs += 1
+
+        if self.B is None:
+            if self.n_obs >= max(self.k + 1, 2):
+                self._refit()
+            return
+        if self.n_obs % self.refresh == 0:
+            self._refit()
+            return
+
+        a = 1.0 - self.lam
+        f = self.B.T @ r
+        e = r - self.B @ f
+        self.F *= self.lam
+        self.F += a * np.outer(f, f)
+        self.d *= self.lam
+        self.d += a * e * e
+        self._wsum = self.lam * self._wsum + a
+
+    def covariance(self) -> np.ndarray:
+        if self.B is None:
+            return np.diag(self.d)
+        return (self.B @ self.F @ self.B.T + np.diag(self.d)) / self._wsum
+
+    def portfolio_var(self, w: np.ndarray) -> float:
+        if self.B is None:
+            return 0.0
+        w = np.nan_to_num(np.asarray(w, dtype=float))
+        bw = self.B.T @ w
+        return float(bw @ self.F @ bw + (w * w) @ self.d) / self._wsum
+
+def portfolio_vol_scale(
+    returns: pd.DataFrame,
+    exposures: pd.DataFrame,
+    target_ann_vol: float = 0.12,
+    halflife: float = 60.0,
+    method: str = "full",
+    n_factors: int = 5,
+    shrink: bool = True,
+    max_leverage: float = 2.0,
+    min_periods: int = 20,
+    periods_per_year: float = TRADING_DAYS,
+) -> pd.Series:
+    """
+    Gross-exposure multiplier so the book's predicted vol hits target_ann_vol.
+
+    exposures[t] are the asset weights held over bar t (already lagged, e.g.
+    positions / N). The predicted variance w_t' Sigma w_t uses the covariance
+    estimated from returns up to t-1 only; the estimator is then updated with
+    r_t. scale = target / predicted vol, clipped to [0, max_leverage] and 0
+    during the first min_periods bars.
+
+    method: "full"   = EWMACovariance (O(N^2) per bar)
+            "factor" = FactorEWMACovariance (O(N k) per bar, for large N)
+    """
+    exposures = exposures.reindex(index=returns.index, columns=returns.columns).fillna(0.0)
+    R = returns.fillna(0.0).to_numpy(dtype=float)
+    W = exposures.to_numpy(dtype=float)
+    n_assets = R.shape[1]
+
+    if method == "full":
+        est = EWMACovariance(n_assets, halflife=halflife, shrink=shrink)
+    elif method == "factor":
+        est = FactorEWMACovariance(n_assets, n_factors=n_factors, halflife=halflife)
+    else:
+        raise ValueError("method must be 'full' or 'factor'")
+
+    target = target_ann_vol / np.sqrt(periods_per_year)
+    scale = np.zeros(len(R))
+    for t in range(len(R)):
+        if t >= min_periods:
+            var = est.portfolio_var(W[t])
+            if var > 0:
+                scale[t] = min(target / np.sqrt(var), max_leverage)
+            elif np.any(W[t]):
+                scale[t] = max_leverage
+        est.update(R[t])
+
+    return pd.Series(scale, index=returns.index, name="vol_scale")
@@ -0,0 +1,97 @@
+from __future__ import annotations
+from itertools import combinations
+import numpy as np
+import pandas as pd
+
+from strategy import performance_metrics
+
+TRADING_DAYS = 252
+
+# -----------------------
+# Membership matrices (subsets x tickers, True = included)
+# -----------------------
+def leave_k_out_membership(tickers, k: int = 1) -> pd.DataFrame:
+    """One row per way of dropping k tickers (k=1 is leave-one-out)."""
+    tickers = list(tickers)
+    drops = list(combinations(range(len(tickers)), k))
+    m = np.ones((len(drops), len(tickers)), dtype=bool)
+    rows = np.repeat(np.arange(len(drops)), k)
+    m[rows, np.asarray(drops).ravel()] = False
+    labels = ["-" + "-".join(tickers[i] for i in d) for d in drops]
+    return pd.DataFrame(m, index=pd.Index(labels, name="subset"), columns=tickers)
+
+def group_dropout_membership(groups: dict[str, str], tickers) -> pd.DataFrame:
+    """One row per group (e.g. sector / asset class) with that group's tickers removed."""
+    tickers = list(tickers)
+    g = pd.Series(groups).reindex(tickers)
+    names = sorted(g.dropna().unique())
+    m = np.array([(g != name).to_numpy() for name in names])
+    return pd.DataFrame(m, index=pd.Index([f"-{n}" for n in names], name="subset"), columns=tickers)
+
+def random_subset_membership(tickers, n_subsets: int = 1000, size: int | None = None, frac: float = 0.5, seed: int = 7) -> pd.DataFrame:
+    """n_subsets random sub-universes of `size` tickers (default frac of the universe)."""
+    tickers = list(tickers)
+    n = len(tickers)
+    size = max(1, int(round(frac * n))) if size is None else size
+    rng = np.random.default_rng(seed)
+    picks = np.argsort(rng.random((n_subsets, n)), axis=1)[:, :size]
+    m = np.zeros((n_subsets, n), dtype=bool)
+    np.put_along_axis(m, picks, True, axis=1)
+    return pd.DataFrame(m, index=pd.Index([f"rand_{i}" for i in range(n_subsets)], name="subset"), columns=tickers)
+
+# -----------------------
+# Evaluation
+# -----------------------
+def subset_returns(legs: pd.DataFrame, membership: pd.DataFrame) -> pd.DataFrame:
+    """
+    Equal-weight portfolio returns of every sub-universe in one matrix multiply:
+      port = legs @ (M / |M|)'
+    legs are the per-asset legs whose row mean is the full portfolio
+    (strat_ret_cost, combine_strategies(..., return_legs=True), ...).
+    Only valid for linear equal-weight aggregation; ranking-based portfolios
+    such as CS momentum change composition with the universe.
+    """
+    m = membership.reindex(columns=legs.columns, fill_value=False).to_numpy(dtype=float)
+    sizes = m.sum(axis=1, keepdims=True)
+    if (sizes == 0).any():
+        raise ValueError("membership has an empty subset")
+    port = legs.fillna(0.0).to_numpy() @ (m / sizes).T
+    return pd.DataFrame(port, index=legs.index, columns=membership.index)
+
+def subset_robustness(
+    legs: pd.DataFrame,
+    membership: pd.DataFrame,
+    periods_per_year: float = TRADING_DAYS,
+) -> pd.DataFrame:
+    """
+    performance_metrics for every sub-universe, plus the Sharpe change versus
+    the full universe (delta_sharpe < 0 means the dropped names helped).
+    """
+    full = performance_metrics(legs.mean(axis=1).to_frame("Full"), periods_per_year=periods_per_year)
+    sub = performance_metrics(subset_returns(legs, membership), periods_per_year=periods_per_year)
+    sub = sub.reindex(membership.index)
+    sub["n_names"] = membership.sum(axis=1)
+    sub["delta_sharpe"] = sub["sharpe_rf0"] - float(full["sharpe_rf0"].iloc[0])
+    return sub
+
+def name_dependence(legs: pd.DataFrame, periods_per_year: float = TRADING_DAYS) -> pd.DataFrame:
+    """
+    Leave-one-out table sorted by how much Sharpe is lost without each name
+    (most important names first).
+    """
+    out = subset_robustness(legs, leave_k_out_membership(legs.columns, 1), periods_per_year)
+    out.index = [s[1:] for s in out.index]
+    out.index.name = "dropped"
+    return out.sort_values("delta_sharpe")
+
+def random_subset_summary(sub: pd.DataFrame) -> pd.DataFrame:
+    """Distribution of Sharpe across random sub-universes."""
+    s = sub["sharpe_rf0"]
+    return pd.DataFrame({
+        "mean": [s.mean()],
+        "std": [s.std()],
+        "p05": [s.quantile(0.05)],
+        "median": [s.median()],
+        "p95": [s.quantile(0.95)],
+        "frac_positive": [(s > 0).mean()],
+    }, index=["sharpe_rf0"])
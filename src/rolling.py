@@ -0,0 +1,182 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+def rolling_moments_array(
+    x: np.ndarray,
+    windows,
+    stds: bool = True,
+    axis: int = 0,
+) -> tuple[dict[int, np.ndarray], dict[int, np.ndarray]]:
+    """
+    Rolling means (and ddof=1 stds) for several windows from one cumulative-sum pass.
+
+    Matches pandas rolling(window).mean() / .std() with the default
+    min_periods=window: a value is NaN unless all `window` observations are
+    present, so late-listed tickers stay NaN until they have full history.
+    Values are centered per series before summing to limit cancellation, and
+    a window of identical values gets an exact 0 std, as in pandas.
+
+    Returns ({window: mean}, {window: std}); the std dict is empty if stds=False.
+    """
+    x = np.moveaxis(np.asarray(x, dtype=float), axis, 0)
+    valid = np.isfinite(x)
+    x0 = np.where(valid, x, 0.0)
+    n_obs = valid.sum(axis=0)
+    center = x0.sum(axis=0) / np.maximum(n_obs, 1)
+    xc = np.where(valid, x0 - center, 0.0)
+
+    zero = np.zeros((1,) + x.shape[1:])
+    c1 = np.concatenate([zero, np.cumsum(xc, axis=0)])
+    c2 = np.concatenate([zero, np.cumsum(xc * xc, axis=0)]) if stds else None
+    csame = None  # running count of bars equal to the previous one, built on demand
+    has_gaps = not valid.all()
+    if has_gaps:
+        cbad = np.concatenate([zero.astype(np.int64), np.cumsum(~valid, axis=0)])
+
+    means, out_stds = {}, {}
+    n = x.shape[0]
+    for w in sorted(set(int(w) for w in windows)):
+        if w < 1:
+            raise ValueError("windows must be >= 1")
+        mean = np.full(x.shape, np.nan)
+        std = np.full(x.shape, np.nan) if stds else None
+
+        if w <= n:
+            m = mean[w - 1:]
+            np.subtract(c1[w:], c1[:-w], out=m)
+            m /= w
+
+            if stds and w > 1:
+                v = std[w - 1:]
+                np.subtract(c2[w:], c2[:-w], out=v)
+                v -= m * m * w
+                v /= w - 1
+                np.maximum(v, 0.0, out=v)
+
+                # windows of w equal values get an exact 0 (as in pandas) rather
+                # than prefix-sum rounding; only near-zero rows can be flat
+                v2 = v.reshape(len(v), -1)
+                near = np.flatnonzero(v2 <= 1e-10 * c2[-1].reshape(-1))
+                if near.size:
+                    if csame is None:
+                        same = np.zeros((n + 1, v2.shape[1]), dtype=np.int64)
+                        same[2:] = (x0[1:] == x0[:-1]).reshape(n - 1, -1)
+                        csame = np.cumsum(same, axis=0)
+                    r, c = np.divmod(near, v2.shape[1])
+                    flat = (csame[r + w, c] - csame[r + 1, c]) == w - 1
+                    v2[r[flat], c[flat]] = 0.0
+                np.sqrt(v, out=v)
+
+            m += center
+            if has_gaps:
+                incomplete = (cbad[w:] - cbad[:-w]) > 0
+                m[incomplete] = np.nan
+                if stds:
+                    std[w - 1:][incomplete] = np.nan
+
+        means[w] = np.moveaxis(mean, 0, axis)
+        if stds:
+            out_stds[w] = np.moveaxis(std, 0, axis)
+
+    return means, out_stds
+
+def rolling_order_stats_array(
+    x: np.ndarray,
+    window: int,
+    quantiles=(),
+    mad: bool = False,
+    axis: int = 0,
+    block_elems: int = 4_000_000,
+) -> dict:
+    """
+    Rolling median, MAD and arbitrary quantiles for a whole panel.
+
+    Windows are sorted a block of rows at a time (sliding-window view, so no
+    per-column loop), after which the median and every quantile (linear
+    interpolation, as pandas rolling().quantile()) are plain reads of the
+    sorted window. The MAD needs one more sort, of |window - median|.
+
+    Matches pandas with min_periods=window: NaN unless the full window is
+    present. MAD is the raw median absolute deviation (no 1.4826 factor).
+
+    Returns {"median": ..., "mad": ... (if mad), q: ... for q in quantiles}.
+    """
+    w = int(window)
+    if w < 1:
+        raise ValueError("window must be >= 1")
+    x = np.moveaxis(np.asarray(x, dtype=float), axis, 0)
+    n = x.shape[0]
+    keys = ["median"] + (["mad"] if mad else []) + [float(q) for q in quantiles]
+    out = {k: np.full(x.shape, np.nan) for k in keys}
+
+    if w <= n:
+        lo_k, hi_k = (w - 1) // 2, w // 2
+        views = np.lib.stride_tricks.sliding_window_view(x, w, axis=0)  # (n - w + 1, ..., w)
+        row_elems = max(1, int(np.prod(views.shape[1:])))
+        step = max(1, block_elems // row_elems)
+
+        for a in range(0, views.shape[0], step):
+            v = np.sort(views[a : a + step], axis=-1)  # NaN sorts last
+            rows = slice(w - 1 + a, w - 1 + a + len(v))
+            med = 0.5 * (v[..., lo_k] + v[..., hi_k])
+            out["median"][rows] = med
+            if mad:
+                dev = np.sort(np.abs(v - med[..., None]), axis=-1)
+                out["mad"][rows] = 0.5 * (dev[..., lo_k] + dev[..., hi_k])
+            for q in keys[1 + mad :]:
+                pos = q * (w - 1)
+                i0 = int(np.floor(pos))
+                i1 = min(i0 + 1, w - 1)
+                out[q][rows] = v[..., i0] + (v[..., i1] - v[..., i0]) * (pos - i0)
+
+        valid = np.isfinite(x)
+        if not valid.all():
+            cbad = np.concatenate([np.zeros((1,) + x.shape[1:], dtype=np.int64), np.cumsum(~valid, axis=0)])
+            incomplete = np.zeros(x.shape, dtype=bool)
+            incomplete[w - 1 :] = (cbad[w:] - cbad[:-w]) > 0
+            for k in keys:
+                out[k][incomplete] = np.nan
+
+    return {k: np.moveaxis(v, 0, axis) for k, v in out.items()}
+
+def _wrap(values: np.ndarray, like):
+    if isinstance(like, pd.Series):
+        return pd.Series(values, index=like.index, name=like.name)
+    return pd.DataFrame(values, index=like.index, columns=like.columns)
+
+def rolling_moments(data, windows, stds: bool = True) -> tuple[dict, dict]:
+    """
+    rolling_moments_array for a Series/DataFrame (rolling along the index).
+    Returns ({window: mean}, {window: std}) with the input's pandas type.
+    """
+    means, out_stds = rolling_moments_array(data.to_numpy(dtype=float), windows, stds=stds)
+    return (
+        {w: _wrap(v, data) for w, v in means.items()},
+        {w: _wrap(v, data) for w, v in out_stds.items()},
+    )
+
+def rolling_mean(data, window: int):
+    """Drop-in for data.rolling(window).mean()."""
+    return rolling_moments(data, [window], stds=False)[0][window]
+
+def rolling_std(data, window: int):
+    """Drop-in for data.rolling(window).std()."""
+    return rolling_moments(data, [window])[1][window]
+
+def rolling_order_stats(data, window: int, quantiles=(), mad: bool = False) -> dict:
+    """rolling_order_stats_array for a Series/DataFrame; values keep the input's pandas type."""
+    stats = rolling_order_stats_array(data.to_numpy(dtype=float), window, quantiles=quantiles, mad=mad)
+    return {k: _wrap(v, data) for k, v in stats.items()}
+
+def rolling_median(data, window: int):
+    """Drop-in for data.rolling(window).median()."""
+    return rolling_order_stats(data, window)["median"]
+
+def rolling_mad(data, window: int):
+    """Rolling median absolute deviation from the window median."""
+    return rolling_order_stats(data, window, mad=True)["mad"]
+
+def rolling_quantile(data, window: int, q: float):
+    """Drop-in for data.rolling(window).quantile(q)."""
+    return rolling_order_stats(data, window, quantiles=[q])[float(q)]
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from path_sim import run_batched_strategy
+
+# name -> (first shocked date, last shocked date)
+DEFAULT_SCENARIOS = {
+    "Q4_2018_selloff": ("2018-10-01", "2018-12-24"),
+    "Covid_crash_2020": ("2020-02-19", "2020-03-23"),
+    "Covid_rebound_2020": ("2020-03-24", "2020-06-08"),
+    "Rate_shock_2022": ("2022-01-03", "2022-10-14"),
+    "Gilt_crisis_2022": ("2022-09-12", "2022-10-12"),
+    "SVB_2023": ("2023-03-08", "2023-03-17"),
+    "Yen_carry_unwind_2024": ("2024-07-16", "2024-08-05"),
+}
+
+def rolling_windows(index: pd.DatetimeIndex, length: int = 20, step: int = 5) -> dict[str, tuple]:
+    """Every `length`-bar window of history, every `step` bars, as scenario windows."""
+    out = {}
+    for i in range(0, len(index) - length + 1, step):
+        a, b = index[i], index[i + length - 1]
+        out[f"{a:%Y-%m-%d}_{length}d"] = (a, b)
+    return out
+
+def build_scenario_library(prices: pd.DataFrame, windows: dict | None = None) -> dict:
+    """
+    Precompute joint daily return blocks for each scenario window.
+
+    Returns a dict with
+      "names"    scenario labels (windows outside the price history are dropped)
+      "tickers"  column order of the blocks
+      "returns"  (scenarios, max_len, tickers) simple returns, zero-padded
+      "mask"     (scenarios, max_len) True on real scenario days
+      "dates"    first/last date per scenario
+    Missing returns (e.g. a ticker not yet listed) are treated as 0.
+    """
+    windows = DEFAULT_SCENARIOS if windows is None else windows
+    rets = prices.pct_change().fillna(0.0)
+    idx = rets.index
+
+    names, blocks, spans = [], [], []
+    for name, (start, end) in windows.items():
+        a = idx.searchsorted(pd.Timestamp(start), side="left")
+        b = idx.searchsorted(pd.Timestamp(end), side="right")
+        if b - a < 1:
+            continue
+        names.append(name)
+        blocks.append(rets.iloc[a:b].to_numpy(dtype=float))
+        spans.append((idx[a], idx[b - 1]))
+
+    if not blocks:
+        raise ValueError("No scenario window overlaps the price history.")
+
+    max_len = max(len(x) for x in blocks)
+    R = np.zeros((len(blocks), max_len, prices.shape[1]))
+    mask = np.zeros((len(blocks), max_len), dtype=bool)
+    for i, x in enumerate(blocks):
+        R[i, : len(x)] = x
+        mask[i, : len(x)] = True
+
+    return {
+        "names": names,
+        "tickers": prices.columns,
+        "returns": R,
+        "mask": mask,
+        "dates": pd.DataFrame(spans, index=names, columns=["start", "end"]),
+    }
+
+def _path_metrics(port: np.ndarray, mask: np.ndarray) -> dict[str, np.ndarray]:
+    # port: (scenarios, days, books); padded days are masked to 0 return
+    port = np.where(mask[:, :, None], port, 0.0)
+    eq = np.cumprod(1.0 + port, axis=1)
+    dd = eq / np.maximum.accumulate(np.maximum(eq, 1.0), axis=1) - 1.0
+    return {
+        "total_return": eq[:, -1] - 1.0,
+        "max_drawdown": dd.min(axis=1),
+        "worst_day": np.where(mask[:, :, None], port, np.inf).min(axis=1),
+    }
+
+def static_scenario_pnl(library: dict, positions) -> pd.DataFrame:
+    """
+    Hold fixed weights through every scenario (rebalanced daily to the same
+    weights). positions is a Series (one book) or a DataFrame (books x tickers).
+    All scenarios x books are one einsum over the precomputed blocks.
+
+    Returns a DataFrame indexed by (scenario, book) with total_return,
+    max_drawdown and worst_day.
+    """
+    if isinstance(positions, pd.Series):
+        positions = positions.to_frame("book").T
+    W = positions.reindex(columns=library["tickers"]).fillna(0.0).to_numpy(dtype=float)
+
+    port = np.einsum("sln,pn->slp", library["returns"], W)
+    m = _path_metrics(port, library["mask"])
+
+    index = pd.MultiIndex.from_product([library["names"], positions.index], names=["scenario", "book"])
+    return pd.DataFrame({k: v.ravel() for k, v in m.items()}, index=index)
+
+def replay_strategies(
+    prices: pd.DataFrame,
+    library: dict,
+    strategies: dict[str, tuple[str, dict]],
+    as_of=None,
+    history: int = 300,
+) -> pd.DataFrame:
+    """
+    Path-dependent replay: append each scenario's joint returns to the price
+    history ending at as_of (default: last date) and re-run the strategies
+    through the shocked window, so signals, positions and vol targets react
+    to the scenario path.
+
+    strategies uses the path_sim format: label -> (kind, params) with kind in
+    "ma_crossover", "multi_strategy", "cs_momentum". All scenarios are run as
+    one (scenarios x dates x tickers) batch; `history` bars of warm-up must
+    cover the longest lookback.
+
+    Returns a DataFrame indexed by (scenario, strategy) with total_return,
+    max_drawdown and worst_day over the scenario days.
+    """
+    hist = prices.loc[:as_of].reindex(columns=library["tickers"]).ffill().iloc[-history:]
+    if hist.iloc[-1].isna().any():
+        raise ValueError("Every ticker needs a price on the as_of date.")
+    hist = hist.bfill()  # names listed inside the warm-up window start flat
+
+    R, mask = library["returns"], library["mask"]
+    n_scen, n_days, _ = R.shape
+    last = hist.iloc[-1].to_numpy(dtype=float)
+
+    shocked = last * np.cumprod(1.0 + R, axis=1)
+    base = np.broadcast_to(hist.to_numpy(dtype=float), (n_scen,) + hist.shape)
+    paths = np.concatenate([base, shocked], axis=1)
+    dates = hist.index.append(pd.bdate_range(hist.index[-1], periods=n_days + 1)[1:])
+
+    port = np.stack(
+        [run_batched_strategy(kind, params, paths, dates)[:, -n_days:] for kind, params in strategies.values()],
+        axis=2,
+    )
+    m = _path_metrics(port, mask)
+    index = pd.MultiIndex.from_product([library["names"], list(strategies)], names=["scenario", "strategy"])
+    return pd.DataFrame({k: v.ravel() for k, v in m.items()}, index=index)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+def gross_and_turnover(
+    signal: pd.DataFrame,
+    asset_ret: pd.DataFrame,
+    lag: int = 1,
+    aggregate: str = "mean",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Gross portfolio return and turnover for positions = signal.shift(lag).
+
+    aggregate="mean" equal-weights asset legs (strategy.py / multi_strategy.py
+    style, where cost is charged per leg then averaged); "sum" treats the
+    signal as portfolio weights (cross_sectional_mom.py style).
+    """
+    pos = signal.shift(lag).fillna(0.0).to_numpy(dtype=float)
+    ret = asset_ret.reindex(index=signal.index, columns=signal.columns).fillna(0.0).to_numpy(dtype=float)
+
+    trades = np.zeros_like(pos)
+    trades[1:] = np.abs(np.diff(pos, axis=0))
+
+    if aggregate == "mean":
+        return (pos * ret).mean(axis=1), trades.mean(axis=1)
+    if aggregate == "sum":
+        return (pos * ret).sum(axis=1), trades.sum(axis=1)
+    raise ValueError("aggregate must be 'mean' or 'sum'")
+
+def net_metrics_for_costs(
+    gross: np.ndarray,
+    turnover: np.ndarray,
+    costs,
+    periods_per_year: float = TRADING_DAYS,
+) -> pd.DataFrame:
+    """
+    performance_metrics of net = gross - cost * turnover for every cost level.
+
+    Mean and vol are closed form in cost:
+      E[net]   = E[g] - c E[t]
+      Var[net] = Var[g] - 2c Cov[g, t] + c^2 Var[t]
+    Max drawdown is path dependent and is computed on the (dates x costs)
+    net matrix in one vectorized pass.
+    """
+    c = np.asarray(costs, dtype=float)
+    n = len(gross)
+
+    mu_g, mu_t = gross.mean(), turnover.mean()
+    var_g = gross.var(ddof=1)
+    var_t = turnover.var(ddof=1)
+    cov_gt = ((gross - mu_g) * (turnover - mu_t)).sum() / (n - 1)
+
+    mu = (mu_g - c * mu_t) * periods_per_year
+    vol = np.sqrt(np.clip(var_g - 2 * c * cov_gt + c * c * var_t, 0.0, None)) * np.sqrt(periods_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = mu / vol
+    sharpe[~np.isfinite(sharpe)] = np.nan
+
+    eq = np.cumprod(1.0 + gross[:, None] - turnover[:, None] * c[None, :], axis=0)
+    max_dd = (eq / np.maximum.accumulate(eq, axis=0) - 1.0).min(axis=0)
+
+    return pd.DataFrame({
+        "mean_ann": mu,
+        "vol_ann": vol,
+        "sharpe_rf0": sharpe,
+        "max_drawdown": max_dd,
+        "turnover_ann": np.full(len(c), mu_t * periods_per_year),
+    }, index=pd.Index(c, name="cost"))
+
+def cost_lag_surface(
+    signals: dict[str, pd.DataFrame],
+    prices: pd.DataFrame,
+    costs=(0.0002, 0.0005, 0.001, 0.002),
+    lags=(0, 1, 2, 3),
+    base_lag: int = 1,
+    aggregate: str = "mean",
+    periods_per_year: float = TRADING_DAYS,
+) -> pd.DataFrame:
+    """
+    (config x lag x cost) metrics cube.
+
+    signals maps a config label to its signal/weight matrix as of each close.
+    For every extra execution lag L the positions are signal.shift(base_lag + L)
+    and gross returns / turnover are computed once; all cost levels are then
+    derived in closed form by net_metrics_for_costs.
+    Use base_lag=0 for weights that are already lagged (build_cs_mom_weights).
+
+    Returns a DataFrame indexed by (config, lag, cost).
+    """
+    asset_ret = prices.pct_change().fillna(0.0)
+    parts = {}
+    for name, sig in signals.items():
+        for lag in lags:
+            g, t = gross_and_turnover(sig, asset_ret, lag=base_lag + lag, aggregate=aggregate)
+            parts[(name, lag)] = net_metrics_for_costs(g, t, costs, periods_per_year)
+
+    out = pd.concat(parts, names=["config", "lag"])
+    return out
@@ -2,6 +2,8 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from rolling import rolling_moments
+
 TRADING_DAYS = 252
 
 def moving_average_crossover_signals(
@@ -18,8 +20,9 @@ def moving_average_crossover_signals(
     if short_window >= long_window:
         raise ValueError("short_window must be < long_window")
 
-    short_ma = prices.rolling(short_window).mean()
-    long_ma = prices.rolling(long_window).mean()
+    means, _ = rolling_moments(prices, [short_window, long_window], stds=False)
+    short_ma = means[short_window]
+    long_ma = means[long_window]
 
     signal = (short_ma > long_ma).astype(int)
     return signal
@@ -50,15 +53,16 @@ def equity_curve(returns: pd.DataFrame, start: float = 1.0) -> pd.DataFrame:
     """
     return start * (1.0 + returns).cumprod()
 
-def performance_metrics(strategy_returns: pd.DataFrame) -> pd.DataFrame:
+def performance_metrics(strategy_returns: pd.DataFrame, periods_per_year: float = TRADING_DAYS) -> pd.DataFrame:
     """
     Annualized mean, vol, Sharpe (rf=0) and max drawdown.
+    periods_per_year: bars per year (see bars.periods_per_year for intraday).
     """
     mu_daily = strategy_returns.mean()
     vol_daily = strategy_returns.std()
 
-    mu_ann = mu_daily * TRADING_DAYS
-    vol_ann = vol_daily * np.sqrt(TRADING_DAYS)
+    mu_ann = mu_daily * periods_per_year
+    vol_ann = vol_daily * np.sqrt(periods_per_year)
     sharpe = (mu_ann / vol_ann).replace([np.inf, -np.inf], np.nan)
 
     eq = equity_curve(strategy_returns).ffill()
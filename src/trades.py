@@ -0,0 +1,125 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+def trade_ledger(
+    positions: pd.DataFrame,
+    prices: pd.DataFrame,
+    cost_per_trade: float = 0.0005,
+) -> pd.DataFrame:
+    """
+    Entry/exit records from a position or weight matrix.
+
+    positions[t] is what is held over bar t (i.e. already lagged, as returned by
+    positions_from_signals or build_cs_mom_weights). A trade is a maximal run
+    of same-sign non-zero exposure in one ticker; size changes inside the run
+    (vol-targeted weights) stay in the same trade, a sign flip starts a new one.
+
+    Change points are found with flatnonzero on the sign series of all tickers
+    laid end to end (zero-padded so runs cannot cross tickers), and per-trade
+    sums are differences of per-ticker cumulative sums, so there is no loop
+    over trades.
+
+    Columns:
+      ticker, side (+1/-1), entry_date / exit_date (first / last bar held),
+      bars_held, gross_pnl (sum of position * return), cost
+      (cost_per_trade * |position change| on entry, resizing and exit, as in
+      apply_transaction_costs), net_pnl, is_open (still held on the last bar)
+    """
+    pos = positions.fillna(0.0)
+    ret = prices.pct_change().reindex(index=pos.index, columns=pos.columns).fillna(0.0)
+
+    P = pos.to_numpy(dtype=float).T
+    n_tickers, n_dates = P.shape
+    width = n_dates + 2
+
+    Pp = np.zeros((n_tickers, width))
+    Pp[:, 1:-1] = P
+    contrib = np.zeros((n_tickers, width))
+    contrib[:, 1:-1] = P * ret.to_numpy(dtype=float).T
+    dpos = np.zeros((n_tickers, width))
+    dpos[:, 1:] = np.abs(np.diff(Pp, axis=1))
+
+    # per-ticker prefix sums: sum over bars [a, b] = cs[b + 1] - cs[a]
+    def _prefix(x):
+        cs = np.zeros((n_tickers, width + 1))
+        np.cumsum(x, axis=1, out=cs[:, 1:])
+        return cs
+
+    s = np.sign(Pp).ravel()
+    prev = np.r_[0.0, s[:-1]]
+    nxt = np.r_[s[1:], 0.0]
+    starts = np.flatnonzero((s != 0) & (s != prev))
+    ends = np.flatnonzero((s != 0) & (s != nxt))
+
+    tid = starts // width
+    a = starts % width
+    b = ends % width
+
+    cs_pnl = _prefix(contrib)
+    cs_dpos = _prefix(dpos)
+    gross = cs_pnl[tid, b + 1] - cs_pnl[tid, a]
+
+    flat = Pp.ravel()
+    is_open = b == n_dates
+    entry = np.abs(flat[starts])
+    internal = cs_dpos[tid, b + 1] - cs_dpos[tid, a + 1]
+    exit_ = np.where(is_open, 0.0, np.abs(flat[ends]))
+    cost = (entry + internal + exit_) * cost_per_trade
+
+    dates = pos.index
+    return pd.DataFrame({
+        "ticker": pos.columns[tid],
+        "side": s[starts].astype(int),
+        "entry_date": dates[a - 1],
+        "exit_date": dates[b - 1],
+        "bars_held": b - a + 1,
+        "gross_pnl": gross,
+        "cost": cost,
+        "net_pnl": gross - cost,
+        "is_open": is_open,
+    })
+
+def trade_ledgers(configs: dict[str, pd.DataFrame], prices: pd.DataFrame, cost_per_trade: float = 0.0005) -> pd.DataFrame:
+    """trade_ledger for many position matrices, stacked with a 'config' column."""
+    parts = [trade_ledger(pos, prices, cost_per_trade).assign(config=name) for name, pos in configs.items()]
+    out = pd.concat(parts, ignore_index=True)
+    return out[["config"] + [c for c in out.columns if c != "config"]]
+
+def trade_stats(ledger: pd.DataFrame, by: str | list[str] | None = None) -> pd.DataFrame:
+    """
+    Trade-level statistics (closed trades only), optionally grouped
+    (e.g. by="config" or by=["config", "ticker"]; by=None gives one "all"
+    row, with n_trades=0 when nothing has closed):
+      n_trades, win_rate, avg_bars_held, avg / median / p05 / p95 net P&L,
+      total_cost, profit_factor (sum of wins / |sum of losses|)
+    """
+    closed = ledger[~ledger["is_open"]]
+    closed = closed.assign(
+        _win=(closed["net_pnl"] > 0).astype(float),
+        _gain=closed["net_pnl"].clip(lower=0.0),
+        _loss=-closed["net_pnl"].clip(upper=0.0),
+    )
+    keys = [] if by is None else ([by] if isinstance(by, str) else list(by))
+    g = closed.groupby(keys if keys else np.zeros(len(closed), dtype=int), sort=True)
+    pnl = g["net_pnl"]
+
+    out = pd.DataFrame({
+        "n_trades": g.size(),
+        "win_rate": g["_win"].mean(),
+        "avg_bars_held": g["bars_held"].mean(),
+        "avg_net_pnl": pnl.mean(),
+        "median_net_pnl": pnl.median(),
+        "p05_net_pnl": pnl.quantile(0.05),
+        "p95_net_pnl": pnl.quantile(0.95),
+        "total_cost": g["cost"].sum(),
+    })
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["profit_factor"] = g["_gain"].sum() / g["_loss"].sum()
+    if not keys:
+        # one "all" row even when no trade has closed yet
+        out = out.reindex([0])
+        out["n_trades"] = out["n_trades"].fillna(0).astype(int)
+        out["total_cost"] = out["total_cost"].fillna(0.0)
+        out.index = ["all"]
+    return out
@@ -0,0 +1,99 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+_OPEN_END = np.datetime64("2262-04-11", "ns")
+
+class Universe:
+    """
+    Point-in-time index membership stored as a sparse interval table:
+    one row per (ticker, start, end) membership spell, end exclusive.
+
+    Memory is O(number of spells), not dates x tickers, and lookups return
+    only the names active on a date.
+    """
+
+    def __init__(self, tickers, ticker_id, start, end):
+        self.tickers = pd.Index(tickers)
+        self.ticker_id = np.asarray(ticker_id, dtype=np.int32)
+        self.start = np.asarray(start, dtype="datetime64[ns]")
+        end = np.asarray(end, dtype="datetime64[ns]")
+        self.end = np.where(np.isnat(end), _OPEN_END, end)
+
+        if not (len(self.ticker_id) == len(self.start) == len(self.end)):
+            raise ValueError("ticker_id, start and end must have the same length")
+
+    @classmethod
+    def from_intervals(cls, intervals: pd.DataFrame) -> "Universe":
+        """
+        Build from a table with columns ticker, start, end
+        (end exclusive; missing end = still a member).
+        """
+        missing = {"ticker", "start", "end"} - set(intervals.columns)
+        if missing:
+            raise ValueError(f"intervals is missing columns: {sorted(missing)}")
+
+        codes, tickers = pd.factorize(intervals["ticker"], sort=True)
+        return cls(
+            tickers,
+            codes,
+            pd.to_datetime(intervals["start"]).to_numpy(),
+            pd.to_datetime(intervals["end"]).to_numpy(),
+        )
+
+    @classmethod
+    def from_mask(cls, mask: pd.DataFrame) -> "Universe":
+        """
+        Build from a boolean dates x tickers membership mask.
+        Each run of True becomes one spell ending on the next date after it.
+        """
+        m = mask.fillna(False).to_numpy(dtype=bool)
+        dates = mask.index.to_numpy(dtype="datetime64[ns]")
+        pad = np.zeros((1, m.shape[1]), dtype=np.int8)
+        edges = np.diff(np.concatenate([pad, m.astype(np.int8), pad]), axis=0)
+
+        start_row, start_col = np.nonzero(edges == 1)
+        end_row, end_col = np.nonzero(edges == -1)
+        # spells are matched by sorting both edge lists on (ticker, row)
+        s_order = np.lexsort((start_row, start_col))
+        e_order = np.lexsort((end_row, end_col))
+
+        dates_ext = np.append(dates, _OPEN_END)
+        return cls(
+            mask.columns,
+            start_col[s_order],
+            dates[start_row[s_order]],
+            dates_ext[end_row[e_order]],
+        )
+
+    @classmethod
+    def static(cls, tickers) -> "Universe":
+        """Every ticker is a member at all times."""
+        n = len(tickers)
+        return cls(tickers, np.arange(n), np.full(n, np.datetime64("1677-09-22", "ns")), np.full(n, _OPEN_END))
+
+    def active(self, date) -> np.ndarray:
+        """Sorted positions (into self.tickers) of members on date."""
+        d = np.datetime64(pd.Timestamp(date), "ns")
+        live = (self.start <= d) & (d < self.end)
+        return np.unique(self.ticker_id[live])
+
+    def active_tickers(self, date) -> pd.Index:
+        return self.tickers[self.active(date)]
+
+    def to_mask(self, dates: pd.DatetimeIndex) -> pd.DataFrame:
+        """Dense dates x tickers boolean mask (for inspection / small universes)."""
+        d = dates.to_numpy(dtype="datetime64[ns]")
+        lo = np.searchsorted(d, self.start, side="left")
+        hi = np.searchsorted(d, self.end, side="left")
+        edges = np.zeros((len(d) + 1, len(self.tickers)), dtype=np.int32)
+        np.add.at(edges, (lo, self.ticker_id), 1)
+        np.add.at(edges, (hi, self.ticker_id), -1)
+        out = np.cumsum(edges[:-1], axis=0) > 0
+        return pd.DataFrame(out, index=dates, columns=self.tickers)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __repr__(self) -> str:
+        return f"Universe({len(self.tickers)} tickers, {len(self.ticker_id)} spells)"
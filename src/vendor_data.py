@@ -0,0 +1,214 @@
+from __future__ import annotations
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Bulk import of vendor end-of-day dumps (one CSV / CSV.GZ per ticker) into a
+# memory-mapped (dates x tickers) panel shaped like fetch_prices output.
+#
+# Panel layout on disk (a directory):
+#   prices.npy   float (dates x tickers), opened with mmap_mode="r" on load
+#   dates.npy    datetime64[D]
+#   tickers.npy  ticker symbols, column order of prices.npy
+
+DEFAULT_COLUMNS = {"date": "date", "close": "close", "split": "split", "dividend": "dividend"}
+
+def ticker_from_path(path) -> str:
+    """'AAPL.csv.gz' -> 'AAPL'."""
+    name = Path(path).name
+    for suffix in (".gz", ".csv", ".txt"):
+        if name.lower().endswith(suffix):
+            name = name[: -len(suffix)]
+    return name
+
+def adjustment_factors(close: np.ndarray, split: np.ndarray | None, dividend: np.ndarray | None) -> np.ndarray:
+    """
+    Backward adjustment factor per row (Yahoo / CRSP convention).
+
+    On an event row e the prices before e are multiplied by
+      m_e = (1 - dividend_e / close_{e-1}) / split_e
+    (split_e = new shares per old share, e.g. 2.0 for a 2:1 split), so
+      factor_t = prod_{e > t} m_e
+    is a reversed cumulative product, and the last row has factor 1.
+    Missing / zero split and dividend entries mean no event.
+    """
+    n = len(close)
+    m = np.ones(n)
+    if split is not None:
+        s = np.where(np.isfinite(split) & (split > 0), split, 1.0)
+        m /= s
+    if dividend is not None and n > 1:
+        d = np.where(np.isfinite(dividend), dividend, 0.0)
+        prev = np.r_[np.nan, close[:-1]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            div_m = 1.0 - d / prev
+        m *= np.where((d != 0) & np.isfinite(div_m) & (div_m > 0), div_m, 1.0)
+
+    factor = np.ones(n)
+    if n > 1:
+        factor[:-1] = np.cumprod(m[:0:-1])[::-1]
+    return factor
+
+def read_vendor_file(path, columns: dict | None = None, adjust: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse one vendor file into (days, adjusted close).
+
+    days is int64 days since 1970-01-01, sorted and unique (last row wins on
+    duplicate dates). Split / dividend columns are optional; files without
+    them are taken as already adjusted. Compression is inferred from the
+    file name.
+    """
+    cols = {**DEFAULT_COLUMNS, **(columns or {})}
+    wanted = {cols[k] for k in DEFAULT_COLUMNS}
+    df = pd.read_csv(path, usecols=lambda c: c in wanted, dtype={cols["date"]: str}, float_precision="legacy")
+
+    raw = df[cols["date"]].to_numpy()
+    try:
+        days = raw.astype("datetime64[D]").astype(np.int64)  # fast path for ISO dates
+    except ValueError:
+        days = pd.to_datetime(raw).to_numpy("datetime64[D]").astype(np.int64)
+    close = df[cols["close"]].to_numpy(dtype=float)
+    split = df[cols["split"]].to_numpy(dtype=float) if cols["split"] in df else None
+    div = df[cols["dividend"]].to_numpy(dtype=float) if cols["dividend"] in df else None
+
+    if len(days) > 1 and not (np.diff(days) > 0).all():
+        order = np.argsort(days, kind="stable")
+        keep = np.r_[days[order][1:] != days[order][:-1], True]
+        order = order[keep]
+        days, close = days[order], close[order]
+        split = None if split is None else split[order]
+        div = None if div is None else div[order]
+
+    if adjust and (split is not None or div is not None):
+        close = close * adjustment_factors(close, split, div)
+    return days, close
+
+def _parse_chunk(args) -> list[tuple[str, np.ndarray, np.ndarray]]:
+    paths, columns, adjust = args
+    return [(ticker_from_path(p), *read_vendor_file(p, columns, adjust)) for p in paths]
+
+def write_panel(path, prices: np.ndarray, dates: np.ndarray, tickers) -> None:
+    """Save an in-memory (dates x tickers) array in the memory-mapped panel layout."""
+    out = Path(path)
+    out.mkdir(parents=True, exist_ok=True)
+    np.save(out / "prices.npy", prices)
+    np.save(out / "dates.npy", np.asarray(dates, dtype="datetime64[D]"))
+    np.save(out / "tickers.npy", np.asarray(list(tickers), dtype=str))
+
+def load_panel(path, tickers: list[str] | None = None, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+    """
+    Load a saved panel as a fetch_prices-style DataFrame (Date index, one
+    column per ticker). The price file is memory-mapped, so only the
+    requested date range and tickers are read from disk.
+    """
+    src = Path(path)
+    dates = pd.DatetimeIndex(np.load(src / "dates.npy"), name="Date")
+    names = np.load(src / "tickers.npy")
+    prices = np.load(src / "prices.npy", mmap_mode="r")
+
+    a = 0 if start is None else dates.searchsorted(pd.Timestamp(start), side="left")
+    b = len(dates) if end is None else dates.searchsorted(pd.Timestamp(end), side="right")
+    if tickers is None:
+        cols = np.arange(len(names))
+    else:
+        lookup = {t: i for i, t in enumerate(names)}
+        missing = [t for t in tickers if t not in lookup]
+        if missing:
+            raise ValueError(f"Tickers not in panel: {missing}")
+        cols = np.array([lookup[t] for t in tickers], dtype=int)
+
+    out = pd.DataFrame(np.asarray(prices[a:b])[:, cols], index=dates[a:b], columns=names[cols])
+    return out.dropna(how="all")
+
+def import_vendor_dump(
+    src_dir,
+    out_dir,
+    pattern: str = "*.csv*",
+    columns: dict | None = None,
+    adjust: bool = True,
+    calendar=None,
+    dtype=np.float64,
+    files_per_task: int = 50,
+    n_jobs: int | None = None,
+) -> dict:
+    """
+    Parse every file matching `pattern` in src_dir (ticker = file name
+    without extension), adjust for splits / dividends and write one
+    memory-mapped panel to out_dir.
+
+    Files are parsed files_per_task at a time across n_jobs processes.
+    The common calendar is the union of all dates unless `calendar` (any
+    date-like sequence) is given, in which case off-calendar rows are
+    dropped. Alignment goes through a day -> row lookup table over the
+    calendar span, so each ticker is placed with one fancy-indexed write.
+
+    Returns a report dict: n_files, n_tickers, n_dates, n_rows,
+    parse_seconds, write_seconds, seconds and rows_per_sec.
+    """
+    t0 = time.perf_counter()
+    paths = sorted(str(p) for p in Path(src_dir).glob(pattern) if p.is_file())
+    if not paths:
+        raise ValueError(f"No files matching {pattern!r} in {src_dir}")
+
+    tasks = [(paths[i : i + files_per_task], columns, adjust) for i in range(0, len(paths), files_per_task)]
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs <= 1 or len(tasks) == 1:
+        parts = [_parse_chunk(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as ex:
+            parts = list(ex.map(_parse_chunk, tasks))
+    series = [s for part in parts for s in part if len(s[1])]
+    if not series:
+        raise ValueError("No rows parsed from vendor files.")
+    t_parse = time.perf_counter()
+
+    tickers = [s[0] for s in series]
+    if len(set(tickers)) != len(tickers):
+        raise ValueError("Duplicate tickers in vendor dump (same name, different extension?)")
+
+    if calendar is None:
+        lo = min(int(d[0]) for _, d, _ in series)
+        hi = max(int(d[-1]) for _, d, _ in series)
+        seen = np.zeros(hi - lo + 1, dtype=bool)
+        for _, d, _ in series:
+            seen[d - lo] = True
+        cal = np.flatnonzero(seen) + lo
+    else:
+        cal = np.unique(pd.DatetimeIndex(calendar).to_numpy("datetime64[D]").astype(np.int64))
+        lo, hi = int(cal[0]), int(cal[-1])
+
+    row_of_day = np.full(hi - lo + 1, -1, dtype=np.int64)
+    row_of_day[cal - lo] = np.arange(len(cal))
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    panel = np.lib.format.open_memmap(out / "prices.npy", mode="w+", dtype=dtype, shape=(len(cal), len(series)))
+    panel[:] = np.nan
+    n_rows = 0
+    for j, (_, d, px) in enumerate(series):
+        inside = (d >= lo) & (d <= hi)
+        rows = row_of_day[d[inside] - lo]
+        ok = rows >= 0
+        panel[rows[ok], j] = px[inside][ok]
+        n_rows += len(d)
+    panel.flush()
+    del panel
+
+    np.save(out / "dates.npy", cal.astype("datetime64[D]"))
+    np.save(out / "tickers.npy", np.asarray(tickers, dtype=str))
+    t_end = time.perf_counter()
+
+    seconds = t_end - t0
+    return {
+        "n_files": len(paths),
+        "n_tickers": len(series),
+        "n_dates": len(cal),
+        "n_rows": n_rows,
+        "parse_seconds": t_parse - t0,
+        "write_seconds": t_end - t_parse,
+        "seconds": seconds,
+        "rows_per_sec": n_rows / seconds if seconds > 0 else float("nan"),
+    }
@@ -0,0 +1,366 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from ewma import ewma_means
+from rolling import rolling_moments_array
+
+# One-step-ahead variance forecasts for a whole (dates x series) return panel.
+# Row t of every forecast only uses returns up to and including t, the same
+# information as rolling_std at row t, so they drop into vol_target_weights.
+
+# -----------------------
+# EWMA (RiskMetrics)
+# -----------------------
+def ewma_variance(returns: pd.DataFrame, halflife: float = 11.0) -> pd.DataFrame:
+    """EWMA of squared returns (halflife 11 ~ RiskMetrics lambda 0.94)."""
+    return ewma_means(returns * returns, [halflife])[halflife]
+
+# -----------------------
+# GARCH(1, 1)
+# -----------------------
+_BLOCKED_MAX_SERIES = 256  # below this the blocked scan beats stepping bar by bar
+
+def _garch_pass_steps(r2, valid, vbar, alpha, beta, grad):
+    # one vector step per bar: cache friendly, best for many series
+    n = r2.shape[1]
+    omega = vbar * (1.0 - alpha - beta)
+    s2 = vbar.copy()
+    ll = np.zeros(n)
+    da, db = np.zeros(n), np.zeros(n)
+    daa, dab, dbb = np.zeros(n), np.zeros(n), np.zeros(n)
+    g = np.zeros((2, n))
+    H = np.zeros((2, 3, n))
+    all_valid = valid.all(axis=1)
+    for t in range(r2.shape[0]):
+        if all_valid[t]:
+            x = r2[t]
+            inv = 1.0 / s2
+            ll -= 0.5 * (np.log(s2) + x * inv)
+        else:
+            ok = valid[t]
+            x = np.where(ok, r2[t], s2)
+            inv = 1.0 / s2
+            ll -= 0.5 * np.where(ok, np.log(s2) + x * inv, 0.0)
+        if grad:
+            u = 0.5 * inv * (x * inv - 1.0)  # dl/ds2, 0 on missing bars
+            c = (x * inv - 0.5) * inv * inv  # -d2l/ds2^2
+            if not all_valid[t]:
+                c = np.where(ok, c, 0.0)
+            sa, sb = u * da, u * db
+            g[0] += sa
+            g[1] += sb
+            H[0, 0] += c * da * da - u * daa
+            H[0, 1] += c * da * db - u * dab
+            H[0, 2] += c * db * db - u * dbb
+            H[1, 0] += sa * sa
+            H[1, 1] += sa * sb
+            H[1, 2] += sb * sb
+            # derivatives of s2_{t+1}; on a missing bar x_t = s2_t also depends on (a, b)
+            m = 0.0 if all_valid[t] else ~ok
+            phi = beta + alpha * m
+            daa = 2.0 * m * da + phi * daa
+            dab = da + m * db + phi * dab
+            dbb = 2.0 * db + phi * dbb
+            da = x - vbar + phi * da
+            db = s2 - vbar + phi * db
+        s2 = omega + alpha * x + beta * s2
+    return ll, g, H, s2
+
+def _scan(c, phi, y0, miss_rows, powers, block):
+    """
+    y_t = c_t + phi_t * y_{t-1} down axis -2 of c (leading axes stack
+    sequences that share phi). Inside a block y_j = P_j (y_prev + sum of
+    c_k / P_k), P the running product of phi; blocks without a missing bar
+    reuse the precomputed powers of beta.
+    """
+    out = np.empty_like(c)
+    y = y0
+    n_rows = c.shape[-2]
+    for a in range(0, n_rows, block):
+        e = min(a + block, n_rows)
+        if miss_rows[a:e].any():
+            P = np.cumprod(phi[a:e], axis=0)
+            inv = 1.0 / P
+        else:
+            P, inv = powers[0][: e - a], powers[1][: e - a]
+        out[..., a:e, :] = P * (y[..., None, :] + np.cumsum(c[..., a:e, :] * inv, axis=-2))
+        y = out[..., e - 1, :]
+    return out
+
+def _garch_pass_blocked(r2, valid, vbar, alpha, beta, grad, block=16):
+    # every recursion is first order with coefficient phi_t, so each one is a
+    # blocked scan over whole arrays: far less Python overhead for few series
+    n = r2.shape[1]
+    omega = vbar * (1.0 - alpha - beta)
+    miss = ~valid
+    miss_rows = miss.any(axis=1)
+    phi = beta + alpha * miss
+    P = beta[None, :] ** np.arange(1, block + 1)[:, None]
+    powers = (P, 1.0 / P)
+
+    S = _scan(omega + alpha * np.where(valid, r2, 0.0), phi, vbar, miss_rows, powers, block)
+    s2 = np.concatenate([vbar[None, :], S[:-1]])  # S[t] = s2_{t+1}
+    inv = 1.0 / s2
+    x = np.where(valid, r2, s2)
+    ratio = x * inv
+    ll = -0.5 * np.where(valid, np.log(s2) + ratio, 0.0).sum(axis=0)
+    if not grad:
+        return ll, None, None, S[-1]
+
+    def lagged(D):
+        return np.concatenate([np.zeros((len(D), 1, n)), D[:, :-1]], axis=1)
+
+    m = miss.astype(float)
+    da, db = lagged(_scan(np.stack([x - vbar, s2 - vbar]), phi, np.zeros((2, n)), miss_rows, powers, block))
+    daa, dab, dbb = lagged(
+        _scan(np.stack([2.0 * m * da, da + m * db, 2.0 * db]), phi, np.zeros((3, n)), miss_rows, powers, block)
+    )
+    u = 0.5 * inv * (ratio - 1.0)
+    c = np.where(valid, (ratio - 0.5) * inv * inv, 0.0)
+    sa, sb = u * da, u * db
+    g = np.stack([sa.sum(axis=0), sb.sum(axis=0)])
+    H = np.array([
+        [(c * da * da - u * daa).sum(axis=0), (c * da * db - u * dab).sum(axis=0), (c * db * db - u * dbb).sum(axis=0)],
+        [(sa * sa).sum(axis=0), (sa * sb).sum(axis=0), (sb * sb).sum(axis=0)],
+    ])
+    return ll, g, H, S[-1]
+
+def _garch_pass(r2: np.ndarray, valid: np.ndarray, vbar, alpha, beta, grad: bool = True):
+    """
+    Variance recursion with variance targeting for every series at once:
+      s2_{t+1} = vbar (1 - a - b) + a r2_t + b s2_t,   s2_0 = vbar
+    A missing return is replaced by its expectation s2_t and left out of
+    the likelihood. With grad=True also accumulates the score in (a, b)
+    and two curvature estimates: minus the exact Hessian (from second
+    derivative recursions of s2) and the BHHH outer product.
+    Returns (loglik, score (2, N), curvature (2, 3, N): [hessian, bhhh] x
+    aa / ab / bb, last s2).
+    """
+    if r2.shape[1] <= _BLOCKED_MAX_SERIES:
+        return _garch_pass_blocked(r2, valid, vbar, alpha, beta, grad)
+    return _garch_pass_steps(r2, valid, vbar, alpha, beta, grad)
+
+def _project(alpha, beta):
+    alpha = np.clip(alpha, 1e-6, 0.5)
+    beta = np.clip(beta, 1e-3, 0.9999 - alpha)  # beta > 0: _scan divides by its powers
+    return alpha, beta
+
+def garch_fit(
+    returns: np.ndarray,
+    start=None,
+    max_iter: int = 50,
+    tol: float = 1e-3,
+    min_obs: int = 30,
+) -> dict:
+    """
+    Gaussian GARCH(1, 1) with variance targeting (omega = var * (1 - a - b))
+    fitted to every column at once by Newton steps (BHHH where the
+    Hessian is not negative definite) with backtracking.
+
+    start is a previous fit's dict to warm-start (a, b) from; otherwise
+    a = 0.05, b = 0.90. Columns with fewer than min_obs observations get
+    NaN. A column stops once its step predicts a log-likelihood gain
+    below tol (along the flat a / b ridge that happens well before the
+    parameters themselves settle) or the step is pinned at a bound.
+
+    Returns dict of arrays (one entry per column): omega, alpha, beta,
+    vbar, loglik, n_iter (likelihood passes), and s2_next, the variance
+    forecast for the bar after the sample.
+    """
+    x = np.asarray(returns, dtype=float)
+    valid = np.isfinite(x)
+    r2 = np.where(valid, x * x, 0.0)
+    n_obs = valid.sum(axis=0)
+    vbar = np.where(n_obs >= min_obs, r2.sum(axis=0) / np.maximum(n_obs, 1), np.nan)
+    fit = (n_obs >= min_obs) & (vbar > 0)
+    vb = np.where(fit, vbar, 1.0)
+
+    if start is None:
+        alpha = np.full(x.shape[1], 0.05)
+        beta = np.full(x.shape[1], 0.90)
+    else:
+        alpha = np.where(np.isfinite(start["alpha"]), start["alpha"], 0.05)
+        beta = np.where(np.isfinite(start["beta"]), start["beta"], 0.90)
+    alpha, beta = _project(alpha, beta)
+
+    # Each iteration is one gradient pass at a trial point per active column.
+    # A trial that raises the likelihood is accepted and its score gives the
+    # next Newton step; otherwise the column's step is halved from the last
+    # accepted point, so backtracking costs no extra passes.
+    n = x.shape[1]
+    n_iter = np.zeros(n, dtype=int)
+    ll = np.full(n, -np.inf)
+    s2 = np.full(n, np.nan)
+    step_a, step_b = np.zeros(n), np.zeros(n)
+    try_a, try_b = alpha.copy(), beta.copy()
+    halvings = np.zeros(n, dtype=int)
+    active = fit.copy()
+    for _ in range(max_iter):
+        cols = np.flatnonzero(active)
+        if len(cols) == 0:
+            break
+        ll_try, g, H, s2_try = _garch_pass(r2[:, cols], valid[:, cols], vb[cols], try_a[cols], try_b[cols])
+
+        ok = ll_try >= ll[cols]
+        acc, rej = cols[ok], cols[~ok]
+        alpha[acc], beta[acc], ll[acc], s2[acc] = try_a[acc], try_b[acc], ll_try[ok], s2_try[ok]
+        n_iter[cols] += 1
+        halvings[acc] = 0
+        halvings[rej] += 1
+
+        # Newton step where minus the Hessian is positive definite, BHHH elsewhere
+        K = H[:, :, ok]
+        det = K[:, 0] * K[:, 2] - K[:, 1] ** 2
+        newton = (K[0, 0] > 0) & (det[0] > 0)
+        K, det = np.where(newton, K[0], K[1]), np.where(newton, det[0], det[1])
+        det = np.where(np.abs(det) > 1e-300, det, np.inf)
+        step_a[acc] = (K[2] * g[0, ok] - K[1] * g[1, ok]) / det
+        step_b[acc] = (K[0] * g[1, ok] - K[1] * g[0, ok]) / det
+        step_a[rej] *= 0.5
+        step_b[rej] *= 0.5
+        try_a, try_b = _project(alpha + step_a, beta + step_b)
+        gain = 0.5 * (step_a[acc] * g[0, ok] + step_b[acc] * g[1, ok])  # predicted loglik gain
+        pinned = np.maximum(np.abs(try_a[acc] - alpha[acc]), np.abs(try_b[acc] - beta[acc])) < 1e-8
+
+        done = np.zeros(n, dtype=bool)
+        done[acc[(gain < tol) | pinned]] = True
+        done[rej[halvings[rej] > 8]] = True
+        active &= ~done
+
+    nan = np.where(fit, 1.0, np.nan)
+    return {
+        "omega": vbar * (1.0 - alpha - beta) * nan,
+        "alpha": alpha * nan,
+        "beta": beta * nan,
+        "vbar": vbar * nan,
+        "loglik": ll * nan,
+        "n_iter": n_iter,
+        "s2_next": s2 * nan,
+    }
+
+def garch_variance(
+    returns: pd.DataFrame,
+    refit_every: int = 252,
+    min_obs: int = 252,
+    fit_window: int | None = None,
+    max_iter: int = 50,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Walk-forward GARCH(1, 1) one-step-ahead variance for every column.
+
+    Parameters are refitted every refit_every bars on the history so far
+    (the last fit_window bars if given), each fit warm-started from the
+    previous one, and held fixed until the next refit. Nothing is
+    forecast before min_obs bars of history.
+
+    Returns (variance DataFrame, parameters per refit date: a DataFrame
+    indexed by (date, field) with one column per series).
+    """
+    x = returns.to_numpy(dtype=float)
+    n_dates, n = x.shape
+    valid = np.isfinite(x)
+    r2 = np.where(valid, x * x, 0.0)
+
+    refits = np.arange(min_obs - 1, n_dates, refit_every)
+    out = np.full((n_dates, n), np.nan)
+    params, prev = {}, None
+    for k, row in enumerate(refits):
+        lo = 0 if fit_window is None else max(0, row + 1 - fit_window)
+        fit = garch_fit(x[lo : row + 1], start=prev, max_iter=max_iter)
+        prev = fit
+        params[returns.index[row]] = pd.DataFrame(
+            {f: fit[f] for f in ("omega", "alpha", "beta", "loglik", "n_iter")}, index=returns.columns
+        ).T
+
+        # filter forward with the new parameters until the next refit
+        stop = refits[k + 1] if k + 1 < len(refits) else n_dates - 1
+        s2 = fit["s2_next"]
+        out[row] = s2
+        a, b, w = fit["alpha"], fit["beta"], fit["omega"]
+        for t in range(row + 1, stop + 1):
+            s2 = w + a * np.where(valid[t], r2[t], s2) + b * s2
+            out[t] = s2
+
+    var = pd.DataFrame(out, index=returns.index, columns=returns.columns)
+    if not params:
+        return var, pd.DataFrame()
+    return var, pd.concat(params, names=["date", "field"])
+
+# -----------------------
+# HAR
+# -----------------------
+def har_variance(
+    returns: pd.DataFrame,
+    refit_every: int = 252,
+    min_obs: int = 252,
+    lags=(1, 5, 22),
+) -> pd.DataFrame:
+    """
+    HAR forecast of next-bar squared return from daily / weekly / monthly
+    means of squared returns (Corsi 2009, with r^2 as the variance proxy).
+
+    Per-series OLS coefficients are refitted every refit_every bars on an
+    expanding window; the normal equations of all series are accumulated
+    incrementally and solved as one batched system. Forecasts are floored
+    at a small fraction of the series' mean squared return to date.
+    """
+    x = returns.to_numpy(dtype=float)
+    n_dates, n = x.shape
+    r2 = x * x
+    means, _ = rolling_moments_array(r2, list(lags), stds=False)
+    F = np.stack([np.ones_like(r2)] + [means[l] for l in lags], axis=2)  # (dates, series, k)
+    k = F.shape[2]
+
+    # training rows pair features at t with the target at t + 1
+    y = np.r_[r2[1:], np.full((1, n), np.nan)]
+    ok = np.isfinite(F).all(axis=2) & np.isfinite(y)
+    Fz = np.where(ok[..., None], F, 0.0)
+    yz = np.where(ok, y, 0.0)
+
+    XtX = np.zeros((n, k, k))
+    Xty = np.zeros((n, k))
+    out = np.full((n_dates, n), np.nan)
+    refits = np.arange(min_obs - 1, n_dates, refit_every)
+    done = 0
+    for i, row in enumerate(refits):
+        # targets up to row are known, so training rows end at row - 1
+        seg = slice(done, row)
+        XtX += np.einsum("tni,tnj->nij", Fz[seg], Fz[seg])
+        Xty += np.einsum("tni,tn->ni", Fz[seg], yz[seg])
+        done = row
+
+        enough = ok[:row].sum(axis=0) > 2 * k
+        coef = np.full((n, k), np.nan)
+        reg = XtX[enough] + 1e-12 * np.eye(k)
+        coef[enough] = np.linalg.solve(reg, Xty[enough][..., None])[..., 0]
+
+        stop = refits[i + 1] if i + 1 < len(refits) else n_dates
+        out[row:stop] = np.einsum("tni,ni->tn", F[row:stop], coef)
+
+    # floor from the mean squared return up to each row (no look-ahead)
+    seen = np.isfinite(r2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        floor = 0.01 * np.nancumsum(r2, axis=0) / np.cumsum(seen, axis=0)
+    out = np.where(np.isfinite(out), np.maximum(out, floor), np.nan)
+    return pd.DataFrame(out, index=returns.index, columns=returns.columns)
+
+# -----------------------
+# Entry point for vol targeting
+# -----------------------
+def forecast_vol(returns: pd.DataFrame, method: str = "garch", min_periods: int = 20, **kwargs) -> pd.DataFrame:
+    """
+    Per-bar volatility forecast (sqrt of the one-step-ahead variance) for
+    method "ewma", "garch" or "har"; kwargs go to the estimator. Rows with
+    fewer than min_periods observations so far are NaN, like a rolling std.
+    """
+    if method == "ewma":
+        var = ewma_variance(returns, **kwargs)
+    elif method == "garch":
+        var, _ = garch_variance(returns, **kwargs)
+    elif method == "har":
+        var = har_variance(returns, **kwargs)
+    else:
+        raise ValueError("method must be 'ewma', 'garch' or 'har'")
+    seen = returns.notna().cumsum()
+    return np.sqrt(var).where(seen >= min_periods)